@@ -0,0 +1,116 @@
+import os
+
+from kivy.atlas import Atlas
+from kivy.core.image import Image as CoreImage
+from kivy.loader import Loader
+
+# Assets Module: one shared texture per image for the whole game. Sprites and button backgrounds are packed into
+# Kivy atlases by build_atlas.py; when an atlas is present every image of its directory is served from it (one
+# texture page, one bind), otherwise the manager falls back to loading the individual files, still only once.
+# Full-screen backgrounds are downscaled to the field size by build_backgrounds.py and decoded ahead of time on
+# Kivy's loader threads by the BackgroundPrefetcher, so swapping them never stalls a frame.
+
+# image directory -> basename of the atlas packing it (the .atlas file and its -N.png pages)
+ATLASES = {
+    "images/small_images": "images/atlas/sprites",
+    "images/buttons": "images/atlas/buttons",
+}
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+BACKGROUND_DIR = "images"           # full-resolution backgrounds and popup images
+FIELD_DIR = "images/field"          # their variants downscaled to the field size
+
+
+def atlas_images(directory):
+    # image files of a directory that go into its atlas, in a stable order
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def field_variant(path):
+    # the field-sized variant of a background when it has been built, else the original image
+    variant = os.path.join(FIELD_DIR, os.path.basename(path))
+    return variant if os.path.exists(variant) else path
+
+
+# AssetManager Class: resolves image paths to atlas entries and keeps every loaded texture alive and shared
+
+class AssetManager:
+    def __init__(self, atlases=ATLASES):
+        self.atlas_paths = atlases
+        self.atlases = None      # image directory -> (atlas basename, Atlas), loaded on first use
+        self.textures = {}       # image path -> texture (an atlas region when packed)
+
+    def _atlas_entry(self, path):
+        # (atlas basename, Atlas, id) for an image packed in an atlas, or None
+        if self.atlases is None:
+            self.atlases = {}
+            for directory, basename in self.atlas_paths.items():
+                if os.path.exists(basename + ".atlas"):
+                    self.atlases[directory] = (basename, Atlas(basename + ".atlas"))
+        directory, filename = os.path.split(path)
+        entry = self.atlases.get(directory)
+        key = os.path.splitext(filename)[0]
+        if entry and key in entry[1].textures:
+            return entry[0], entry[1], key
+        return None
+
+    def source(self, path):
+        # what to give Kivy properties that take a source (e.g. Button.background_normal)
+        found = self._atlas_entry(path)
+        if found:
+            return f"atlas://{found[0]}/{found[2]}"
+        return path
+
+    def texture(self, path):
+        # the shared texture of an image, loaded on first request
+        texture = self.textures.get(path)
+        if texture is None:
+            found = self._atlas_entry(path)
+            texture = found[1][found[2]] if found else CoreImage(path).texture
+            self.textures[path] = texture
+        return texture
+
+    def preload(self, paths=None):
+        # load every image of the atlased directories (or the given paths) up front, so that level starts and new
+        # widgets never read from disk
+        if paths is None:
+            paths = [path for directory in self.atlas_paths for path in atlas_images(directory)]
+        for path in paths:
+            self.texture(path)
+
+    def report(self):
+        # memory used per texture, as RGBA bytes. Atlas regions share their page, which is counted once in the total.
+        rows = []
+        pages = {}
+        for path, texture in sorted(self.textures.items()):
+            page = getattr(texture, "owner", None) or texture
+            pages[id(page)] = page.width * page.height * 4
+            rows.append({"path": path, "width": texture.width, "height": texture.height,
+                         "bytes": texture.width * texture.height * 4, "shared": page is not texture})
+        return {"textures": rows, "total_bytes": sum(pages.values())}
+
+
+# BackgroundPrefetcher Class: decodes backgrounds on Kivy's loader worker threads before they are needed and keeps
+# the resulting textures, so a level or screen change only swaps a texture
+
+class BackgroundPrefetcher:
+    def __init__(self):
+        self.images = {}         # source path -> ProxyImage being (or already) loaded
+
+    def prefetch(self, path):
+        source = field_variant(path)
+        if source not in self.images:
+            self.images[source] = Loader.image(source)
+
+    def texture(self, path):
+        # the decoded texture, or None while the worker thread is still busy (or the image was never prefetched)
+        proxy = self.images.get(field_variant(path))
+        if proxy is not None and proxy.loaded:
+            return proxy.texture
+        return None
+
+
+assets = AssetManager()
+backgrounds = BackgroundPrefetcher()
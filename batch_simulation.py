@@ -0,0 +1,297 @@
+import numpy as np
+
+import cannon_constants as const
+
+# Batch Simulation Module: NumPy-backed counterpart of simulation.World for bulk runs (AI training, large stress
+# levels). Every entity lives in a row of contiguous arrays and integration, wall bouncing and the swept-circle hit
+# tests are vectorized; only the rare hits themselves are resolved one by one, with the same rules as
+# simulation.World.resolve_hit. The game itself does not use this module, but NumPy is a dependency of the game
+# all the same: trajectory.py and obstacle.py need it.
+
+OBSTACLE_CODES = {"target": 0, "rock": 1, "perpetio": 2, "mirror": 3, "wormhole": 4}
+PROJECTILE_CODES = {"bullet": 0, "bombshell": 1, "laser": 2}
+TARGET, ROCK, PERPETIO, MIRROR, WORMHOLE = range(5)
+BULLET, BOMBSHELL, LASER = range(3)
+
+
+class _Table:
+    # growable struct-of-arrays: columns share one row count and double their capacity when full
+    def __init__(self, columns, capacity):
+        self.columns = columns      # name -> (dtype, trailing shape)
+        self.count = 0
+        for name, (dtype, shape) in columns.items():
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+
+    def append(self, **values):
+        if self.count == len(getattr(self, next(iter(self.columns)))):
+            self._grow(max(16, self.count * 2))
+        row = self.count
+        for name, value in values.items():
+            getattr(self, name)[row] = value
+        self.count += 1
+        return row
+
+    def _grow(self, capacity):
+        for name, (dtype, shape) in self.columns.items():
+            grown = np.zeros((capacity,) + shape, dtype=dtype)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+
+    def compact(self, keep):
+        # drop the rows where keep is False, preserving the order of the others
+        kept = int(keep.sum())
+        for name in self.columns:
+            column = getattr(self, name)
+            column[:kept] = column[:self.count][keep]
+        self.count = kept
+
+
+def _swept_box(prev_position, position, radius):
+    # lower and upper corners of the boxes enclosing circles of `radius` moving from prev_position to position
+    reach = radius[:, None]
+    return np.minimum(prev_position, position) - reach, np.maximum(prev_position, position) + reach
+
+
+def _ranks(counts):
+    # 0, 1, ..., n - 1 for every n of counts, concatenated
+    return np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+
+
+# ArrayWorld Class: array-backed world with the same step(dt) contract as simulation.World
+
+class ArrayWorld:
+    def __init__(self, width=const.SCREEN_WIDTH, height=const.SCREEN_HEIGHT, capacity=64):
+        self.width = width
+        self.height = height
+        self.obstacles = _Table({
+            "position": (np.float64, (2,)),
+            "prev_position": (np.float64, (2,)),
+            "velocity": (np.float64, (2,)),
+            "radius": (np.float64, ()),
+            "hit_radius": (np.float64, ()),
+            "health": (np.int32, ()),       # only meaningful for targets and rocks
+            "kind": (np.uint8, ()),
+            "active": (np.bool_, ()),
+        }, capacity)
+        self.projectiles = _Table({
+            "position": (np.float64, (2,)),
+            "prev_position": (np.float64, (2,)),
+            "velocity": (np.float64, (2,)),
+            "radius": (np.float64, ()),
+            "kind": (np.uint8, ()),
+            "active": (np.bool_, ()),
+            "timer": (np.float64, ()),      # laser time left
+            "range_left": (np.float64, ()),  # laser distance or bombshell drill left
+            "teleport_cooldown": (np.float64, ()),
+        }, capacity)
+        self.pairs_tested = 0    # narrow-phase tests run during the last step
+        self.hits = 0            # contacts resolved during the last step
+
+    @classmethod
+    def from_world(cls, world):
+        # copy the bodies of a simulation.World into arrays
+        batch = cls(world.width, world.height, capacity=max(16, len(world.obstacles)))
+        for body in world.obstacles:
+            batch.add_obstacle(body.obstacle_type, body.position, (body.vx, body.vy), body.radius,
+                               body.hit_radius, -1 if body.health is None else body.health)
+        for body in world.projectiles:
+            row = batch.add_projectile(body.projectile_type, body.position, body.velocity)
+            if body.projectile_type == "laser":
+                batch.projectiles.timer[row] = body.laser_timer
+                batch.projectiles.range_left[row] = const.LASER_DIST - body.laser_traveled_distance
+            elif body.projectile_type == "bombshell":
+                batch.projectiles.range_left[row] = body.bomb_drill_remaining
+            batch.projectiles.teleport_cooldown[row] = body.teleport_cooldown if body.just_teleported else 0
+        return batch
+
+    def add_obstacle(self, obstacle_type, position, velocity=(0, 0), radius=30, hit_radius=None, health=None):
+        if health is None:
+            health = 3 if obstacle_type in ["target", "rock"] else -1
+        return self.obstacles.append(
+            position=position, prev_position=position, velocity=velocity, radius=radius,
+            hit_radius=radius if hit_radius is None else hit_radius, health=health,
+            kind=OBSTACLE_CODES[obstacle_type], active=True
+        )
+
+    def add_projectile(self, projectile_type, position, velocity):
+        radius = {"bullet": const.BULLET_RADIUS, "bombshell": const.BOMB_RADIUS, "laser": const.LASER_RADIUS}
+        range_left = {"bullet": 0, "bombshell": const.BOMB_DRILL, "laser": const.LASER_DIST}
+        return self.projectiles.append(
+            position=position, prev_position=position, velocity=velocity, radius=radius[projectile_type],
+            kind=PROJECTILE_CODES[projectile_type], active=True, timer=const.LASER_IMPULSE,
+            range_left=range_left[projectile_type], teleport_cooldown=0
+        )
+
+    def targets_left(self):
+        obs = self.obstacles
+        n = obs.count
+        return bool(np.any(obs.active[:n] & (obs.kind[:n] == TARGET)))
+
+    def compact(self):
+        # drop destroyed obstacles from the arrays; worth calling between waves of a long bulk run
+        self.obstacles.compact(self.obstacles.active[:self.obstacles.count].copy())
+
+    def step(self, dt):
+        # advance every entity by dt, resolve collisions and return the points scored during the step
+        self._update_obstacles(dt)
+        self._update_projectiles(dt)
+        points = self.handle_collisions()
+        self.projectiles.compact(self.projectiles.active[:self.projectiles.count].copy())
+        return points
+
+    def _update_obstacles(self, dt):
+        obs = self.obstacles
+        n = obs.count
+        pos, vel, radius = obs.position[:n], obs.velocity[:n], obs.radius[:n]
+        obs.prev_position[:n] = pos
+        pos += vel * dt
+        # bounce off the field edges by flipping the velocity component, as ObstacleBody.update does
+        hit_x = (pos[:, 0] - radius <= 0) | (pos[:, 0] + radius >= self.width)
+        hit_y = (pos[:, 1] - radius <= 0) | (pos[:, 1] + radius >= self.height)
+        vel[hit_x, 0] *= -1
+        vel[hit_y, 1] *= -1
+
+    def _update_projectiles(self, dt):
+        proj = self.projectiles
+        n = proj.count
+        pos, vel, kind, active = proj.position[:n], proj.velocity[:n], proj.kind[:n], proj.active[:n]
+        proj.prev_position[:n] = pos
+        np.subtract(proj.teleport_cooldown[:n], dt, out=proj.teleport_cooldown[:n])
+
+        laser = kind == LASER
+        vel[~laser, 1] -= const.GRAVITY * dt
+        proj.timer[:n][laser] -= dt
+        step = vel * dt
+        pos += step
+        moved = np.hypot(step[:, 0], step[:, 1])
+        ranged = kind != BULLET
+        proj.range_left[:n][ranged] -= moved[ranged]
+
+        # lasers and bombshells run out of time or distance; everything leaves the extended game area eventually
+        spent = ranged & (proj.range_left[:n] <= 0)
+        spent |= laser & (proj.timer[:n] <= 0)
+        margin = 1000
+        r = proj.radius[:n]
+        gone = ((pos[:, 0] + r < -margin) | (pos[:, 0] - r > const.SCREEN_WIDTH + margin) |
+                (pos[:, 1] + r < -margin) | (pos[:, 1] - r > const.SCREEN_HEIGHT + margin))
+        active &= ~(spent | gone)
+
+    def candidate_pairs(self):
+        # grid broad phase: the (obstacle, projectile) row pairs whose swept bounding boxes overlap. Obstacles are
+        # sorted by the grid cell holding the lower corner of their box, the cells being as large as the largest
+        # box, so an obstacle overlapping a projectile sits in a cell from one column/row before the projectile's
+        # box to its last one. Each row of those cells is a contiguous run of the sorted obstacles, found by binary
+        # search; only the pairs of the runs are then checked box against box. Memory and time follow the number
+        # of nearby pairs, not obstacles x projectiles.
+        obs, proj = self.obstacles, self.projectiles
+        o_rows = np.flatnonzero(obs.active[:obs.count])
+        p_rows = np.flatnonzero(proj.active[:proj.count])
+        empty = np.zeros(0, dtype=np.intp)
+        if not len(o_rows) or not len(p_rows):
+            return empty, empty
+        o_low, o_high = _swept_box(obs.prev_position[o_rows], obs.position[o_rows], obs.hit_radius[o_rows])
+        p_low, p_high = _swept_box(proj.prev_position[p_rows], proj.position[p_rows], proj.radius[p_rows])
+
+        size = max(float((o_high - o_low).max()), 1.0)
+        origin = o_low.min(axis=0)
+        o_cell = ((o_low - origin) // size).astype(np.intp)
+        columns, rows = o_cell.max(axis=0) + 1
+        o_key = o_cell[:, 1] * columns + o_cell[:, 0]
+        order = np.argsort(o_key, kind="stable")
+        keys = o_key[order]
+
+        # cells each projectile has to look at, clipped to the occupied grid
+        first_cell = np.maximum(((p_low - size - origin) // size).astype(np.intp), 0)
+        last_cell = np.minimum(((p_high - origin) // size).astype(np.intp), (columns - 1, rows - 1))
+        row_counts = np.maximum(last_cell[:, 1] - first_cell[:, 1] + 1, 0)
+        row_counts[last_cell[:, 0] < first_cell[:, 0]] = 0
+        p_index = np.repeat(np.arange(len(p_rows)), row_counts)
+        row = np.repeat(first_cell[:, 1], row_counts) + _ranks(row_counts)
+        first = np.searchsorted(keys, row * columns + first_cell[p_index, 0], side="left")
+        last = np.searchsorted(keys, row * columns + last_cell[p_index, 0], side="right")
+
+        # expand the runs into flat pair arrays and keep the overlapping boxes
+        runs = last - first
+        p_index = np.repeat(p_index, runs)
+        o_index = order[np.repeat(first, runs) + _ranks(runs)]
+        overlap = np.all((o_low[o_index] <= p_high[p_index]) & (p_low[p_index] <= o_high[o_index]), axis=1)
+        return o_rows[o_index[overlap]], p_rows[p_index[overlap]]
+
+    def time_of_impact(self):
+        # vectorized swept-circle test of the pairs left by the broad phase. Returns the (obstacle, projectile, t)
+        # arrays of the pairs touching during the last step, t in 0..1.
+        obs, proj = self.obstacles, self.projectiles
+        o_rows, p_rows = self.candidate_pairs()
+        self.pairs_tested = len(o_rows)
+        if not self.pairs_tested:
+            return o_rows, p_rows, np.zeros(0)
+
+        reach = obs.hit_radius[o_rows] + proj.radius[p_rows]
+        start = proj.prev_position[p_rows] - obs.prev_position[o_rows]
+        move = (proj.position[p_rows] - obs.position[o_rows]) - start
+        a = np.einsum("ij,ij->i", move, move)
+        b = np.einsum("ij,ij->i", start, move)
+        c = np.einsum("ij,ij->i", start, start) - reach * reach
+        discriminant = b * b - a * c
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (-b - np.sqrt(np.maximum(discriminant, 0))) / a
+        approaching = (a > 0) & (b < 0) & (discriminant >= 0) & (t <= 1)
+        t = np.where(c < 0, 0.0, np.where(approaching, t, np.inf))
+        hit = np.isfinite(t)
+        return o_rows[hit], p_rows[hit], t[hit]
+
+    def handle_collisions(self):
+        # resolve the hits earliest first, dropping the later hits of a projectile a hit sent elsewhere, as
+        # simulation.World does
+        o_hit, p_hit, t = self.time_of_impact()
+        proj = self.projectiles
+        points = 0
+        self.hits = 0
+        redirected = set()
+        for index in np.lexsort((p_hit, o_hit, t)):
+            o, p = o_hit[index], p_hit[index]
+            if self.obstacles.active[o] and proj.active[p] and p not in redirected:
+                self.hits += 1
+                position, velocity = proj.position[p].copy(), proj.velocity[p].copy()
+                points += self.resolve_hit(o, p)
+                if not (np.array_equal(proj.position[p], position) and np.array_equal(proj.velocity[p], velocity)):
+                    redirected.add(p)
+        return points
+
+    def resolve_hit(self, o, p):
+        # apply the effect of one projectile/obstacle contact (by row) and return the points it scores
+        obs, proj = self.obstacles, self.projectiles
+        kind = obs.kind[o]
+        if kind == WORMHOLE:
+            if proj.teleport_cooldown[p] > 0:
+                return 0
+            others = np.flatnonzero(obs.active[:obs.count] & (obs.kind[:obs.count] == WORMHOLE))
+            others = others[others != o]
+            if len(others):
+                exit_hole = others[0]
+                proj.position[p] = obs.position[exit_hole] + (obs.radius[exit_hole] + 10)
+                proj.prev_position[p] = proj.position[p]
+                proj.teleport_cooldown[p] = 0.5
+        elif kind == MIRROR:
+            if proj.kind[p] == LASER:
+                proj.velocity[p] *= -1
+            else:
+                proj.active[p] = False
+        elif kind == PERPETIO:
+            proj.active[p] = False
+        elif kind == TARGET or kind == ROCK:
+            obs.health[o] -= 1
+            if obs.health[o] > 0:
+                return 0
+            if proj.kind[p] == BOMBSHELL:
+                # bombshell penetration: remove every obstacle within BOMB_RADIUS of the impact point
+                n = obs.count
+                offset = obs.position[:n] - proj.position[p]
+                blast = obs.active[:n] & (np.einsum("ij,ij->i", offset, offset) <= const.BOMB_RADIUS ** 2)
+                obs.active[:n] &= ~blast
+                return 10 * int(np.count_nonzero(blast & (obs.kind[:n] == TARGET)))
+            obs.active[o] = False
+            proj.active[p] = False
+            return 10 if kind == TARGET else 0
+        return 0
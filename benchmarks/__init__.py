@@ -0,0 +1,2 @@
+# Benchmarks Package: headless, seeded performance benchmarks of the game's hot paths. Run from the project root:
+#     python -m benchmarks [--quick] [--output results.json] [--compare baseline.json]
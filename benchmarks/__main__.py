@@ -0,0 +1,52 @@
+import argparse
+import json
+import logging
+import sys
+
+from benchmarks import bench_simulation, bench_trajectory, bench_hall_of_fame  # noqa: F401 (registers them)
+from benchmarks.harness import REGISTRY, compare, environment
+
+# Benchmark runner: runs every registered benchmark (or those whose group or name matches --filter), prints one
+# line per case and writes the results as JSON. With --compare, exits with status 1 if any case is slower than
+# the baseline by more than --tolerance.
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Headless performance benchmarks.")
+    parser.add_argument("--quick", action="store_true", help="fewer sizes and repeats, for a smoke run")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose group or name contains this")
+    parser.add_argument("--output", help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown fraction (default 0.25)")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("cannon").setLevel(logging.WARNING)   # keep the game's info messages out of the timings
+    results = []
+    for group, func in REGISTRY:
+        if args.filter and args.filter not in group and args.filter not in func.__name__:
+            continue
+        for result in func(args.quick):
+            result["group"] = group
+            results.append(result)
+            print(f"{result['name']:<48} {result['best_us']:>12.1f} us  {result['ops_per_s']:>12.1f} /s",
+                  file=sys.stderr)
+
+    report = {"environment": environment(), "quick": args.quick, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.1f} us -> {after:.1f} us", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
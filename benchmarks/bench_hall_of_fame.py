@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+from hall_of_fame import Leaderboard
+
+from benchmarks.harness import benchmark, measure, seeded
+
+# Hall of Fame Benchmarks: the leaderboard store at growing sizes: importing the old text format, adding an entry
+# and reading the first page, a deep page and one player's page of the board.
+
+ENTRY_COUNTS = (100, 10000, 100000)
+
+
+@benchmark("hall_of_fame")
+def leaderboard(quick):
+    with tempfile.TemporaryDirectory() as directory:
+        for count in ENTRY_COUNTS[:2] if quick else ENTRY_COUNTS:
+            rng = seeded(count)
+            path = os.path.join(directory, f"hall_of_fame_{count}.txt")
+            with open(path, "w") as f:
+                for index in range(count):
+                    f.write(f"Nickname: player{index}, Score: {rng.randrange(-50, 400, 10)}, "
+                            f"Level: {rng.randint(1, 3)}\n")
+            board = Leaderboard(os.path.join(directory, f"hall_of_fame_{count}.db"))
+            result = measure(f"hall_of_fame.import.entries_{count}", lambda: board.import_text(path), repeat=1,
+                             entries=count)
+            yield result
+
+            added = iter(range(10 ** 9))
+            yield measure(f"hall_of_fame.add.entries_{count}",
+                          lambda: board.add(f"bench{next(added)}", rng.randrange(-50, 400, 10), level=1),
+                          number=20, repeat=3 if quick else 7, entries=count)
+            yield measure(f"hall_of_fame.top_page.entries_{count}", board.top, number=10,
+                          repeat=3 if quick else 7, entries=count)
+            middle = board.top(count // 2)[-1]
+            yield measure(f"hall_of_fame.deep_page.entries_{count}", lambda: board.top(after=middle), number=10,
+                          repeat=3 if quick else 7, entries=count)
+            yield measure(f"hall_of_fame.player_page.entries_{count}", lambda: board.top(nickname="player7"),
+                          number=10, repeat=3 if quick else 7, entries=count)
+            board.close()
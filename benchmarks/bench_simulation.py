@@ -0,0 +1,82 @@
+import simulation
+from simulation import World, ProjectileBody, launch_velocity, make_obstacle, make_target
+
+from benchmarks.harness import benchmark, measure, seeded
+
+# Simulation Benchmarks: world stepping, collision handling and level initialization, all headless.
+
+STEP_DT = 1.0 / simulation.const.PHYSICS_RATE
+ENTITY_COUNTS = (10, 50, 200, 1000)
+OBSTACLE_MIX = ("target", "rock", "mirror", "perpetio", "wormhole")
+
+
+def crowded_world(obstacles, projectiles, seed):
+    # a world with `obstacles` bodies of every type and `projectiles` shots spread over the field, mid-flight
+    rng = seeded(seed)
+    world = World()
+    for index in range(obstacles):
+        obstacle_type = OBSTACLE_MIX[index % len(OBSTACLE_MIX)]
+        position = [rng.uniform(50, world.width - 50), rng.uniform(50, world.height - 50)]
+        if obstacle_type == "target":
+            body = make_target(position, rng=rng)
+        else:
+            body = make_obstacle(obstacle_type, position, rng=rng)
+        world.add_obstacle(body)
+    kinds = ("bullet", "bombshell", "laser")
+    for index in range(projectiles):
+        body = world.add_projectile(ProjectileBody(kinds[index % 3], (rng.uniform(0, world.width),
+                                                                      rng.uniform(0, world.height))))
+        body.velocity = launch_velocity(body.projectile_type, rng.uniform(0, 90), rng.uniform(10, 100))
+    return world
+
+
+@benchmark("simulation")
+def entity_updates(quick):
+    # ticks per second of World.step with moving obstacles and no projectiles: integration and wall bounces only
+    for count in ENTITY_COUNTS[:2] if quick else ENTITY_COUNTS:
+        world = crowded_world(count, 0, seed=count)
+        ticks = 120
+        yield measure(f"simulation.step.obstacles_{count}", lambda: world.step(STEP_DT), number=ticks,
+                      repeat=3 if quick else 5, entities=count)
+
+
+@benchmark("simulation")
+def collisions(quick):
+    # World.handle_collisions on the same positions every repeat, with one projectile per ten obstacles
+    for count in ENTITY_COUNTS[:2] if quick else ENTITY_COUNTS:
+        world = crowded_world(count, max(1, count // 10), seed=count)
+        world.step(STEP_DT)     # give every body a swept path
+        obstacles = world.snapshot()
+        projectiles = [(body, body.position[:], body.prev_position[:], body.velocity[:]) for body in world.projectiles]
+
+        def restore():
+            world.restore(obstacles)
+            world.projectiles = []
+            for body, position, prev_position, velocity in projectiles:
+                body.reset(position)
+                body.prev_position[:] = prev_position
+                body.velocity = velocity[:]
+                world.projectiles.append(body)
+
+        result = measure(f"simulation.collisions.obstacles_{count}", world.handle_collisions,
+                         repeat=20 if quick else 50, setup=restore, entities=count + len(projectiles))
+        restore()
+        world.handle_collisions()
+        result["pairs_tested"] = world.pairs_tested
+        result["hits"] = world.hits
+        yield result
+
+
+@benchmark("simulation")
+def level_initialization(quick):
+    # the headless part of CanGame.initialize_obstacles: populate the world and take the reset snapshot
+    for level in (1, 2, 3):
+        rng = seeded(level)
+
+        def initialize():
+            world = World()
+            world.populate(level, rng)
+            world.snapshot()
+
+        yield measure(f"simulation.initialize_obstacles.level_{level}", initialize, number=10,
+                      repeat=3 if quick else 10, level=level)
@@ -0,0 +1,50 @@
+from simulation import World
+from trajectory import TrajectoryCache, dash_mesh, merge_meshes, predicted_points, preview_points
+
+from benchmarks.harness import benchmark, measure, seeded
+
+# Trajectory Benchmarks: analytic and simulated previews for each projectile type, and their mesh buffers.
+
+PROJECTILE_TYPES = ("bullet", "bombshell", "laser")
+START = (130, 220)
+ANGLE = 45
+POWER = 80
+
+
+@benchmark("trajectory")
+def analytic_preview(quick):
+    for projectile_type in PROJECTILE_TYPES:
+        yield measure(f"trajectory.preview_points.{projectile_type}",
+                      lambda: preview_points(projectile_type, START, ANGLE, POWER), number=20,
+                      repeat=3 if quick else 10)
+
+
+@benchmark("trajectory")
+def simulated_preview(quick):
+    # the in-level preview: a copy of a level 3 world stepped until the shot ends
+    world = World()
+    world.populate(3, seeded(3))
+    for projectile_type in PROJECTILE_TYPES:
+        points = predicted_points(world, projectile_type, START, ANGLE, POWER)
+        yield measure(f"trajectory.predicted_points.{projectile_type}",
+                      lambda: predicted_points(world, projectile_type, START, ANGLE, POWER),
+                      repeat=3 if quick else 10, points=sum(len(piece) for piece in points))
+
+
+@benchmark("trajectory")
+def preview_mesh(quick):
+    # dash buffers of a full-length preview, and a cache miss of the whole in-level refresh as CanGame requests it
+    points = preview_points("bullet", START, ANGLE, POWER)
+    yield measure("trajectory.dash_mesh", lambda: dash_mesh(points), number=20, repeat=3 if quick else 10,
+                  points=len(points))
+    pieces = [points[:len(points) // 2], points[len(points) // 2:]]
+    yield measure("trajectory.merge_meshes", lambda: merge_meshes(dash_mesh(piece) for piece in pieces),
+                  number=20, repeat=3 if quick else 10)
+    # computed inline rather than on the worker, so the time of the miss itself is measured
+    cache = TrajectoryCache(background=False)
+    world = World()
+    world.populate(3, seeded(3))
+    for projectile_type in PROJECTILE_TYPES:
+        yield measure(f"trajectory.cache_miss.{projectile_type}",
+                      lambda: cache.get(projectile_type, START, ANGLE, POWER, world=world), setup=cache.clear,
+                      repeat=5 if quick else 20)
@@ -0,0 +1,77 @@
+import platform
+import random
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+# Harness Module: registry and timing helpers shared by the bench_* modules. A benchmark is a generator registered
+# with @benchmark; it builds its inputs from a fixed seed and yields one result dict per measured case, made by
+# measure(). Results are plain JSON-friendly dicts so runs can be stored and compared between builds.
+
+SEED = 20240501
+REGISTRY = []       # (group, function) in registration order
+
+
+def benchmark(group):
+    def register(func):
+        REGISTRY.append((group, func))
+        return func
+    return register
+
+
+def seeded(seed=SEED):
+    # a generator of its own for each benchmark input, so every run builds the same inputs
+    return random.Random(seed)
+
+
+def measure(name, func, number=1, repeat=5, setup=None, **extra):
+    # time `number` calls of func, `repeat` times; setup (untimed) runs before each repeat to restore the inputs.
+    # The best repeat is the figure to compare, the median shows the noise.
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        times.append((perf_counter() - start) / number)
+    best = min(times)
+    result = {
+        "name": name,
+        "number": number,
+        "repeat": repeat,
+        "best_us": best * 1e6,
+        "median_us": statistics.median(times) * 1e6,
+        "ops_per_s": 1.0 / best if best > 0 else float("inf"),
+    }
+    result.update(extra)
+    return result
+
+
+def environment():
+    # what the numbers were measured on, stored next to them
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+        "seed": SEED,
+    }
+
+
+def compare(results, baseline, tolerance):
+    # names of the cases more than `tolerance` (a fraction) slower than in the baseline run
+    previous = {result["name"]: result["best_us"] for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before and result["best_us"] > before * (1 + tolerance):
+            regressions.append((result["name"], before, result["best_us"]))
+    return regressions
@@ -0,0 +1,27 @@
+import os
+import sys
+
+from kivy.atlas import Atlas
+
+from assets import ATLASES, atlas_images
+
+# Build step: packs the sprites and the button backgrounds into the Kivy atlases listed in assets.ATLASES.
+# Run it (it needs Pillow) whenever an image under images/small_images or images/buttons changes:
+#     python build_atlas.py [page size, default 1024]
+
+
+def build(size=1024):
+    for directory, basename in ATLASES.items():
+        images = atlas_images(directory)
+        os.makedirs(os.path.dirname(basename), exist_ok=True)
+        result = Atlas.create(basename, images, size)
+        if not result:
+            print(f"Could not pack {directory} into {size}x{size} pages; try a larger size.")
+            return False
+        filename, meta = result
+        print(f"{directory}: {len(images)} images packed into {len(meta)} page(s) -> {filename}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if build(*(int(arg) for arg in sys.argv[1:2])) else 1)
@@ -0,0 +1,33 @@
+import os
+import sys
+
+from PIL import Image
+
+import cannon_constants as const
+from assets import BACKGROUND_DIR, FIELD_DIR, IMAGE_EXTENSIONS
+
+# Build step: writes a copy of every background and popup image under images/ downscaled to fit the game field
+# (SCREEN_WIDTH x SCREEN_HEIGHT, aspect ratio kept) into images/field/, which the game then loads instead of the
+# full-resolution originals. Run it (it needs Pillow) whenever one of those images changes:
+#     python build_backgrounds.py
+
+
+def build(size=(const.SCREEN_WIDTH, const.SCREEN_HEIGHT)):
+    os.makedirs(FIELD_DIR, exist_ok=True)
+    for name in sorted(os.listdir(BACKGROUND_DIR)):
+        source = os.path.join(BACKGROUND_DIR, name)
+        if not name.lower().endswith(IMAGE_EXTENSIONS) or not os.path.isfile(source):
+            continue
+        with Image.open(source) as image:
+            original = image.size
+            image.thumbnail(size, Image.LANCZOS)     # only ever shrinks
+            if name.lower().endswith((".jpg", ".jpeg")):
+                image.convert("RGB").save(os.path.join(FIELD_DIR, name), quality=90, optimize=True)
+            else:
+                image.save(os.path.join(FIELD_DIR, name), optimize=True)
+            print(f"{source}: {original[0]}x{original[1]} -> {image.size[0]}x{image.size[1]}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if build() else 1)
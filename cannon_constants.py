@@ -29,3 +29,67 @@ BOMB_DRILL = 900                     # Maximum penetration (drill) distance for
 LASER_VEL = 325                      # Constant speed for the laser
 LASER_IMPULSE = 3                    # Duration (in seconds) the laser remains active
 LASER_DIST = 1000                    # Maximum distance the laser travels
+LASER_RADIUS = 50                    # Collision radius of the laser beam
+
+# Gravitational acceleration applied to bullets and bombshells
+GRAVITY = 9.8
+
+# Fixed-timestep physics parameters
+RENDER_RATE = 120                    # Rate (in frames per second) at which the game loop redraws the widgets
+PHYSICS_RATE = 120                   # Physics steps per second, independent of the render rate
+MAX_SUBSTEPS = 8                     # Maximum physics steps per rendered frame (backlog beyond this is dropped)
+
+# Collision broad phase
+COLLISION_CELL = 100                 # Side (in pixels) of the spatial hash cells used to find nearby bodies
+BROAD_PHASE_MIN_PROJECTILES = 8      # With fewer projectiles in flight, each is tested against every obstacle
+
+# Trajectory preview
+TRAJ_POINT_SPACING = 8               # Approximate distance (in pixels) between two points of the preview
+TRAJ_MAX_POINTS = 240                # Upper bound on the number of points of the preview
+TRAJ_CACHE_SIZE = 256                # Number of previews (shot parameter combinations) kept ready for reuse
+TRAJ_LINE_WIDTH = 1.5                # Thickness (in pixels) of the dashed preview line
+TRAJ_STEP_BUDGET = 14400             # Most physics steps simulated for one preview (120 s, beyond any flight)
+TRAJ_STATE_QUANTUM = 6               # Pixels obstacles may drift before a simulated preview is recomputed
+
+# Cannon
+CANNON_POSITION = (100, 190)         # Position of the cannon's pivot during a level
+CANNON_BARREL = 60                   # Length (in pixels) of the cannon barrel; shots start 10 pixels past its end
+
+# Replays
+REPLAY_DIR = "replays"               # Directory where the input recording of every finished game is saved
+
+# Levels
+LEVELS_FILE = "levels.json"          # Level definitions: counts, spawn regions, speeds, backgrounds, fixed layouts
+LEVELS_CACHE = "levels.cache"        # Precompiled layouts of LEVELS_FILE, rebuilt whenever that file changes
+
+# Random seeds
+GAME_SEED = None                     # Seed used for every game (None: a new random seed per game)
+SEED_RANGE = 10 ** 9                 # Game seeds are drawn from 0 to SEED_RANGE - 1
+
+# Hall of Fame
+HALL_OF_FAME_FILE = "hall_of_fame.txt"  # Old text leaderboard, imported into the database on first start
+LEADERBOARD_DB = "hall_of_fame.db"   # SQLite leaderboard database
+LEADERBOARD_SYNC = "NORMAL"          # SQLite fsync policy of the leaderboard: "OFF", "NORMAL" or "FULL" (every commit)
+LEADERBOARD_JOURNAL = "WAL"          # "WAL" when every game runs on one host, "DELETE" for a database on a network disk
+LEADERBOARD_BUSY_TIMEOUT = 10.0      # Seconds a process waits for another one to finish writing the leaderboard
+LEADERBOARD_READ_TIMEOUT = 0.2       # Seconds the Hall of Fame waits for a locked leaderboard before showing it empty
+LEADERBOARD_BATCH_SIZE = 64          # Most Hall of Fame entries written in one transaction
+LEADERBOARD_BATCH_WINDOW = 0.05      # Seconds the writer thread waits for more entries before committing a batch
+LEADERBOARD_RETRIES = 3              # Attempts at writing a batch before it is given up
+HALL_OF_FAME_PAGE = 100              # Entries fetched per page of the Hall of Fame
+HALL_OF_FAME_ROW_HEIGHT = 28         # Height (in dp) of a row of the Hall of Fame list
+HALL_OF_FAME_PREFETCH = 0.1          # Scroll position (1 top, 0 bottom) below which the next page is fetched
+
+# Diagnostics
+LOG_LEVEL = "INFO"                   # Level of the game's loggers (DEBUG enables the per-frame messages)
+LOG_CONSOLE_LEVEL = "WARNING"        # Records from this level up are also printed to the console
+LOG_RING_SIZE = 1000                 # Number of log records kept in memory
+
+# Profiler
+PROFILE_ENABLED = False              # Measure every level frame and write the trace on exit (else F3 measures while shown)
+PROFILE_WINDOW = 600                 # Frames (5 s at RENDER_RATE) behind the rolling percentiles of the overlay
+PROFILE_TRACE_FRAMES = 36000         # Frames kept for the trace written on exit (5 minutes at RENDER_RATE)
+PROFILE_BUCKETS_MS = (1, 2, 4, 8, 16, 33)  # Upper edges (in ms) of the frame-time histogram buckets
+PROFILE_COUNTERS = ("entities", "pairs", "hits", "substeps")  # Per-frame counters, shown as counts not times
+PROFILE_OVERLAY_EVERY = 30           # Frames between two refreshes of the on-screen overlay
+PROFILE_TRACE_FILES = ("profile_trace.csv", "profile_trace.json")  # Trace files written when the game exits
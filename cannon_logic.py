@@ -1,6 +1,11 @@
-import math
 from kivy.uix.widget import Widget
 from kivy.graphics import PushMatrix, PopMatrix, Rotate, Rectangle
+import cannon_constants as const
+from assets import assets
+from diagnostics import get_logger
+from simulation import cannon_tip
+
+log = get_logger("input")
 
 # Cannon Class: Responsible for rendering and controlling the cannon's rotation and projectile launch position
 
@@ -10,14 +15,14 @@ class Cannon(Widget):
         super().__init__(**kwargs)
         self.position = position    # logical center position of the cannon
         self.angle = angle          # initial rotation angle (in degrees)
-        self.barrel_length = 60     # length of the cannon barrel
+        self.barrel_length = const.CANNON_BARREL    # length of the cannon barrel
 
         # set up the cannon image with rotation transformation
         with self.canvas:
             PushMatrix()
             self.rotation = Rotate(angle=self.angle, origin=self.position)  # rotation transformation
             self.image = Rectangle(
-                source="images/small_images/cannon_widget.png",
+                texture=assets.texture("images/small_images/cannon_widget.png"),
                 size=(170, 128),                                            # dimensions of the cannon image
                 pos=(self.position[0] - 50, self.position[1] - 25)          # position adjusted to center the image
             )
@@ -33,7 +38,7 @@ class Cannon(Widget):
         # update the rotation transformation and request a redraw
         self.rotation.angle = self.angle
         self.canvas.ask_update()
-        print(f"Cannon rotated to angle: {self.angle}")
+        log.debug("Cannon rotated to angle: %s", self.angle)
 
     def get_angle(self):
         # returns the current rotation angle of the cannon. :return: Current angle in degrees.
@@ -41,7 +46,4 @@ class Cannon(Widget):
 
     def get_tip_position(self):
         # calculates and returns the position of the cannon barrel's tip. This position is used as the starting point for projectiles. :return: A list [tip_x, tip_y] representing the tip position.
-        radian_angle = math.radians(self.angle)
-        tip_x = self.position[0] + math.cos(radian_angle) * (self.barrel_length + 10)  # adjusted length
-        tip_y = self.position[1] + math.sin(radian_angle) * (self.barrel_length + 10)  # adjusted length
-        return [tip_x, tip_y]
+        return cannon_tip(self.position, self.angle, self.barrel_length)
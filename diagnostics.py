@@ -0,0 +1,54 @@
+import logging
+from collections import deque
+
+import cannon_constants as const
+
+# Diagnostics Module: logging for the whole game. Each subsystem logs through its own child of the "cannon" logger
+# (cannon.sim, cannon.input, ...) with lazy %-style arguments, so a disabled message costs a level check and nothing
+# else. Per-frame messages are logged at DEBUG, which is off by default. Records are kept in an in-memory ring
+# buffer; only warnings and errors reach the console unless asked otherwise.
+
+ROOT_LOGGER = "cannon"
+SUBSYSTEMS = ("sim", "input", "ui", "trajectory", "assets", "scores")
+
+
+def get_logger(subsystem):
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+# RingBufferHandler Class: keeps the last `capacity` records in memory, cheap enough to leave on at all times
+
+class RingBufferHandler(logging.Handler):
+    def __init__(self, capacity=const.LOG_RING_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter("%(relativeCreated)9.0f ms %(name)s %(levelname)s: %(message)s"))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def dump(self):
+        # the buffered records as formatted lines, oldest first
+        return [self.format(record) for record in list(self.records)]
+
+
+ring_buffer = RingBufferHandler()
+
+
+def setup_logging(level=const.LOG_LEVEL, console_level=const.LOG_CONSOLE_LEVEL, levels=None):
+    # configure the "cannon" loggers: `level` for all subsystems, `levels` to override single ones
+    # (e.g. {"sim": "DEBUG"}), and the level from which records are also printed to the console
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.propagate = False      # keep our records out of Kivy's console handler
+    for subsystem, subsystem_level in (levels or {}).items():
+        get_logger(subsystem).setLevel(subsystem_level)
+    if ring_buffer not in root.handlers:
+        root.addHandler(ring_buffer)
+    console = next((h for h in root.handlers if isinstance(h, logging.StreamHandler)), None)
+    if console is None:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter("[%(name)s] %(levelname)s: %(message)s"))
+        root.addHandler(console)
+    console.setLevel(console_level)
+    return root
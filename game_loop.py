@@ -0,0 +1,52 @@
+from kivy.clock import Clock
+
+import cannon_constants as const
+
+# GameLoop Class: the single owned handle on the periodic update callback. Starting an already running loop is a
+# no-op, so level starts, restarts and resumes can never stack several schedules of the same callback.
+
+
+class GameLoop:
+    def __init__(self, callback, rate=const.RENDER_RATE):
+        self.callback = callback
+        self.interval = 1.0 / rate
+        self.event = None       # the Kivy clock event while the loop is scheduled
+        self.paused = False
+        self.frames = 0         # number of ticks delivered to the callback
+        self.starts = 0         # number of times the callback was actually scheduled
+
+    @property
+    def running(self):
+        return self.event is not None
+
+    def start(self):
+        # schedule the callback unless it already is; clears any pause
+        self.paused = False
+        if self.event is None:
+            self.event = Clock.schedule_interval(self._tick, self.interval)
+            self.starts += 1
+
+    def stop(self):
+        # cancel the callback; a stopped loop is not paused and only restarts through start()
+        self.paused = False
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+
+    def pause(self):
+        # suspend the callback so that resume() can pick it up again
+        if self.event is not None:
+            self.stop()
+            self.paused = True
+
+    def resume(self):
+        if self.paused:
+            self.start()
+
+    def stats(self):
+        # diagnostics: how often the loop ticked and was scheduled
+        return {"running": self.running, "paused": self.paused, "frames": self.frames, "starts": self.starts}
+
+    def _tick(self, dt):
+        self.frames += 1
+        self.callback(dt)
@@ -0,0 +1,313 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import cannon_constants as const
+from diagnostics import get_logger
+
+log = get_logger("scores")
+
+# Hall of Fame Module: the leaderboard store. Entries live in an SQLite database in WAL mode, indexed by score so a
+# page of the best entries costs O(log n + page) whatever the size of the board, and by their display line so
+# duplicates are rejected by a unique index lookup instead of a scan. The old text file ("Nickname: ..., Score: ...,
+# Level: ..." per line) is imported once. Kept free of Kivy so the popup and the benchmarks share it.
+# The game reads through a read-only Leaderboard on the UI thread and writes through a LeaderboardWriter, whose thread
+# creates the database and batches the entries into transactions, so the UI thread never waits for the write lock.
+# WAL lets the reads run alongside.
+# Several game processes can share one database: every write is a transaction that takes the write lock up front
+# (BEGIN IMMEDIATE) and waits up to const.LEADERBOARD_BUSY_TIMEOUT for it, duplicates are settled by the unique
+# index inside that transaction, and each read sees the board as of one commit without holding writers back.
+
+EMPTY_MESSAGE = "No Hall of Fame data found."
+
+INSERT = "INSERT OR IGNORE INTO entries (nickname, score, level, winner, seed, entry) VALUES (?, ?, ?, ?, ?, ?)"
+SYNC_MODES = ("OFF", "NORMAL", "FULL")
+JOURNAL_MODES = ("WAL", "DELETE")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    nickname TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER,                  -- level reached, NULL for winners
+    winner INTEGER NOT NULL DEFAULT 0,
+    seed INTEGER,                   -- game seed, NULL for entries older than the seeds
+    entry TEXT NOT NULL UNIQUE      -- the line shown in the Hall of Fame
+);
+CREATE INDEX IF NOT EXISTS entries_by_score ON entries (score DESC, id);
+CREATE INDEX IF NOT EXISTS entries_by_player ON entries (nickname, score DESC, id);
+CREATE TABLE IF NOT EXISTS imports (path TEXT PRIMARY KEY);
+"""
+
+
+def format_entry(nickname, score, level=None, seed=None, winner=False):
+    # the display line of an entry, in the format of the old text file
+    entry = f"Nickname: {nickname}, Score: {score}, " + ("WINNER" if winner else f"Level: {level}")
+    return entry if seed is None else f"{entry}, Seed: {seed}"
+
+
+def parse_entry(line):
+    # fields of a line of the old text file, or None when the line is not an entry
+    nickname, found, rest = line.strip().removeprefix("Nickname: ").partition(", Score: ")
+    if not found:
+        return None
+    fields = rest.split(", ")
+    try:
+        score = int(fields[0])
+    except ValueError:
+        return None
+    level, seed, winner = None, None, False
+    for field in fields[1:]:
+        key, _, value = field.partition(": ")
+        if key == "WINNER":
+            winner = True
+        elif key == "Level" and value.isdigit():
+            level = int(value)
+        elif key == "Seed" and value.isdigit():
+            seed = int(value)
+    return {"nickname": nickname, "score": score, "level": level, "seed": seed, "winner": winner}
+
+
+# Leaderboard Class: one connection to the store; every write is a single short transaction. A read_only board never
+# writes, not even the schema: it connects on its first read, waits at most const.LEADERBOARD_READ_TIMEOUT for another
+# process's lock, and reads as empty while the database is missing, not created yet or locked.
+
+class Leaderboard:
+    def __init__(self, path=const.LEADERBOARD_DB, synchronous=const.LEADERBOARD_SYNC,
+                 journal_mode=const.LEADERBOARD_JOURNAL, read_only=False):
+        # synchronous is SQLite's fsync policy: "FULL" syncs every commit, "NORMAL" only at WAL checkpoints (a
+        # power cut may lose the last commits, never corrupt the board), "OFF" leaves it to the OS.
+        # journal_mode "WAL" needs every process on the same host; "DELETE" also works for a database on a shared
+        # network disk, at the cost of readers waiting while a writer commits.
+        if synchronous not in SYNC_MODES:
+            raise ValueError(f"synchronous must be one of {SYNC_MODES}")
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"journal_mode must be one of {JOURNAL_MODES}")
+        self.path = path
+        self.read_only = read_only
+        self.db = None
+        if read_only:
+            return      # connected by the first read
+        # autocommit mode: transactions are opened explicitly by _transaction, reads never hold one open
+        self.db = sqlite3.connect(path, timeout=const.LEADERBOARD_BUSY_TIMEOUT, isolation_level=None)
+        if self.db.execute("PRAGMA journal_mode").fetchone()[0].upper() != journal_mode:
+            self.db.execute(f"PRAGMA journal_mode={journal_mode}")   # only the first process has to switch it
+        self.db.execute(f"PRAGMA synchronous={synchronous}")
+        with self._transaction():
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.db.execute(statement)
+
+    @contextmanager
+    def _transaction(self):
+        # write transaction taking the database's write lock at BEGIN, waiting for other processes to release it;
+        # a deferred BEGIN could deadlock two processes that both read before writing
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def add(self, nickname, score, level=None, seed=None, winner=False):
+        # insert an entry; False when the same entry is already on the board
+        return self.add_many([(nickname, score, level, seed, winner)])[0]
+
+    def add_many(self, entries):
+        # insert (nickname, score, level, seed, winner) entries in one transaction: all of them or, if anything
+        # fails, none. Returns for each whether it was new.
+        added = []
+        with self._transaction():
+            for nickname, score, level, seed, winner in entries:
+                cursor = self.db.execute(INSERT, (nickname, score, level, int(winner), seed,
+                                                  format_entry(nickname, score, level, seed, winner)))
+                added.append(cursor.rowcount == 1)
+        return added
+
+    def top(self, limit=const.HALL_OF_FAME_PAGE, after=None, nickname=None):
+        # the next `limit` entries, best score first, as (score, id, entry) rows, optionally of one player only.
+        # Pass the last row of a page as `after` to get the following one: the index seeks straight to it,
+        # however deep the page is.
+        conditions, params = [], []
+        if nickname is not None:
+            conditions.append("nickname = ?")
+            params.append(nickname)
+        if after is not None:
+            score, row_id = after[:2]
+            conditions.append("score <= ? AND (score < ? OR id > ?)")
+            params += [score, score, row_id]
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return self._read(f"SELECT score, id, entry FROM entries {where}ORDER BY score DESC, id LIMIT ?",
+                          params + [limit])
+
+    def count(self, nickname=None):
+        if nickname is None:
+            rows = self._read("SELECT COUNT(*) FROM entries")
+        else:
+            rows = self._read("SELECT COUNT(*) FROM entries WHERE nickname = ?", (nickname,))
+        return rows[0][0] if rows else 0
+
+    def _read(self, query, params=()):
+        if not self.read_only:
+            return self.db.execute(query, params).fetchall()
+        try:
+            if self.db is None:
+                self.db = sqlite3.connect(f"file:{quote(os.path.abspath(self.path))}?mode=ro", uri=True,
+                                          timeout=const.LEADERBOARD_READ_TIMEOUT, isolation_level=None)
+            return self.db.execute(query, params).fetchall()
+        except sqlite3.OperationalError as e:
+            # no database or no table yet, or locked: an empty board for now, and a new connection next time
+            log.debug("Leaderboard not readable: %s", e)
+            self.close()
+            return []
+
+    def import_text(self, path=const.HALL_OF_FAME_FILE):
+        # one-time import of a text Hall of Fame; returns the number of entries added (0 once already imported)
+        key = os.path.abspath(path)
+        if self.db.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+            return 0
+        try:
+            with open(path, "r") as f:
+                entries = [fields for fields in map(parse_entry, f) if fields is not None]
+        except FileNotFoundError:
+            return 0
+        with self._transaction():
+            # checked again under the write lock: another process may have imported it in the meantime
+            if self.db.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+                return 0
+            before = self.db.total_changes
+            self.db.executemany(
+                INSERT,
+                ((e["nickname"], e["score"], e["level"], int(e["winner"]), e["seed"],
+                  format_entry(e["nickname"], e["score"], e["level"], e["seed"], e["winner"])) for e in entries))
+            imported = self.db.total_changes - before
+            self.db.execute("INSERT INTO imports (path) VALUES (?)", (key,))
+        return imported
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+# LeaderboardWriter Class: owns a connection on a thread of its own. add() only queues the entry; the thread
+# gathers what arrives within const.LEADERBOARD_BATCH_WINDOW seconds (up to const.LEADERBOARD_BATCH_SIZE entries)
+# and commits it as one transaction, retrying a failed batch a few times before giving it up. A job that fails is
+# logged and counted in `failed`, and the thread goes on with the next one.
+
+class LeaderboardWriter:
+    def __init__(self, path=const.LEADERBOARD_DB, synchronous=const.LEADERBOARD_SYNC,
+                 batch_size=const.LEADERBOARD_BATCH_SIZE, batch_window=const.LEADERBOARD_BATCH_WINDOW):
+        self.path = path
+        self.synchronous = synchronous
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.queue = queue.Queue()
+        self.written = 0        # entries committed so far
+        self.failed = 0         # entries given up after the retries
+        self.thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self.thread.start()
+
+    def add(self, nickname, score, level=None, seed=None, winner=False):
+        self._put(("add", (nickname, score, level, seed, winner)))
+
+    def import_text(self, path=const.HALL_OF_FAME_FILE):
+        # queue the one-time import of a text Hall of Fame
+        self._put(("import", path))
+
+    def _put(self, job):
+        # queue a job, unless the thread is gone and nothing would ever take it
+        if not self.thread.is_alive():
+            self.failed += 1
+            log.error("Leaderboard writer stopped, %s job dropped", job[0])
+            return
+        self.queue.put(job)
+
+    def flush(self):
+        # block until everything queued so far is committed (or given up), or the thread is gone; returns whether
+        # the queue was emptied
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks and self.thread.is_alive():
+                self.queue.all_tasks_done.wait(0.1)
+            return not self.queue.unfinished_tasks
+
+    def close(self):
+        # commit what is queued and stop the thread
+        if self.thread.is_alive():
+            self.queue.put(("stop", None))
+            self.thread.join()
+
+    def _run(self):
+        # the board is opened (and the schema created) here rather than on the UI thread; a job opens it again if
+        # that failed
+        board = None
+        try:
+            board = Leaderboard(self.path, self.synchronous)
+        except Exception as e:
+            log.warning("Could not open the leaderboard %s: %s", self.path, e)
+        while True:
+            job = self.queue.get()
+            taken = 1
+            try:
+                if job[0] == "stop":
+                    break
+                if job[0] == "import":
+                    board = self._attempt(board, lambda board: self._import(board, job[1]), 1)
+                    continue
+
+                # gather a batch of entries, stopping early at an import or at the end of the queue
+                batch = [job[1]]
+                deadline = time.monotonic() + self.batch_window
+                while len(batch) < self.batch_size:
+                    try:
+                        job = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if job[0] != "add":
+                        self.queue.put(job)     # handled on the next turn, after this batch
+                        break
+                    batch.append(job[1])
+                board = self._attempt(board, lambda board: self._write(board, batch), len(batch))
+            except Exception:
+                log.exception("Leaderboard writer job failed")
+            finally:
+                for _ in range(taken):
+                    self.queue.task_done()
+        if board is not None:
+            board.close()
+
+    def _attempt(self, board, write, count):
+        # run write(board), opening the board first when needed. Database errors (such as a lock held too long by
+        # another process) are retried; anything else, such as an unreadable text file, gives the job up at once.
+        # Returns the board, None if it could not be opened.
+        for attempt in range(const.LEADERBOARD_RETRIES):
+            try:
+                if board is None:
+                    board = Leaderboard(self.path, self.synchronous)
+                write(board)
+                return board
+            except sqlite3.Error as e:
+                log.warning("Leaderboard write failed (attempt %s): %s", attempt + 1, e)
+                time.sleep(0.1 * 2 ** attempt)
+            except Exception:
+                log.exception("Leaderboard write failed")
+                break
+        self.failed += count
+        log.error("Gave up writing %s leaderboard entries", count)
+        return board
+
+    def _write(self, board, batch):
+        added = board.add_many(batch)
+        self.written += sum(added)
+        log.info("Saved %s Hall of Fame entries (%s duplicates skipped)", sum(added), len(added) - sum(added))
+
+    def _import(self, board, path):
+        imported = board.import_text(path)
+        if imported:
+            log.info("Imported %s entries from %s", imported, path)
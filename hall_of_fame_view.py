@@ -0,0 +1,83 @@
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.textinput import TextInput
+
+import cannon_constants as const
+from hall_of_fame import EMPTY_MESSAGE
+
+# HallOfFameView Class: content of the Hall of Fame popup. The entries are shown by a RecycleView, which only keeps
+# widgets for the rows on screen, and are fetched from the leaderboard one page at a time as the list is scrolled
+# towards its end, so opening the popup costs one page query and a screenful of labels whatever the board's size.
+# A filter bar switches between all entries, one player's entries and the current player's best scores.
+
+
+class HallOfFameRow(Label):
+    # one entry line, left aligned on the row
+    def __init__(self, **kwargs):
+        super().__init__(color=(1, 1, 1, 1), font_size='16sp', halign="left", valign="middle", **kwargs)
+        self.bind(size=self.setter('text_size'))
+
+
+class HallOfFameView(BoxLayout):
+    def __init__(self, leaderboard, nickname="", **kwargs):
+        super().__init__(orientation="vertical", padding=(60, 100, 60, 40), spacing=10, **kwargs)
+        self.leaderboard = leaderboard
+        self.nickname = nickname        # the current player, for "My best"
+        self.filter = None              # nickname the list is restricted to, None for every entry
+        self.last_row = None            # (score, id, entry) of the last loaded row: where the next page starts
+        self.exhausted = False
+
+        # filter bar: a player name to look up, every entry, the current player's best scores
+        bar = BoxLayout(orientation="horizontal", size_hint_y=None, height=dp(40), spacing=10)
+        self.player_input = TextInput(hint_text="Player", multiline=False)
+        self.player_input.bind(on_text_validate=lambda instance: self.show(instance.text.strip() or None))
+        all_button = Button(text="All", size_hint_x=0.25)
+        all_button.bind(on_press=lambda instance: self.show(None))
+        mine_button = Button(text="My best", size_hint_x=0.3, disabled=not nickname)
+        mine_button.bind(on_press=lambda instance: self.show(self.nickname))
+        bar.add_widget(self.player_input)
+        bar.add_widget(all_button)
+        bar.add_widget(mine_button)
+        self.add_widget(bar)
+
+        # the virtualized list
+        self.list = RecycleView(size_hint=(1, 1), viewclass=HallOfFameRow)
+        rows = RecycleBoxLayout(orientation="vertical", size_hint_y=None, default_size_hint=(1, None),
+                                default_size=(None, dp(const.HALL_OF_FAME_ROW_HEIGHT)))
+        rows.bind(minimum_height=rows.setter('height'))
+        self.list.add_widget(rows)
+        self.list.bind(scroll_y=self.on_scroll)
+        self.add_widget(self.list)
+
+        self.show(None)
+
+    def show(self, nickname):
+        # restart the list from the best entry, restricted to `nickname` when given
+        self.filter = nickname
+        self.last_row = None
+        self.exhausted = False
+        self.list.data = []
+        self.list.scroll_y = 1
+        self.load_page()
+        if not self.list.data:
+            self.list.data = [{"text": EMPTY_MESSAGE}]
+
+    def load_page(self):
+        # append the next page of the board to the list
+        if self.exhausted:
+            return
+        page = self.leaderboard.top(after=self.last_row, nickname=self.filter)
+        if len(page) < const.HALL_OF_FAME_PAGE:
+            self.exhausted = True
+        if page:
+            self.last_row = page[-1]
+            self.list.data.extend({"text": entry} for _, _, entry in page)
+
+    def on_scroll(self, instance, scroll_y):
+        # scroll_y goes from 1 at the top to 0 at the bottom; fetch more when the end of the loaded rows is near
+        if scroll_y <= const.HALL_OF_FAME_PREFETCH and not self.exhausted:
+            self.load_page()
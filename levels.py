@@ -0,0 +1,365 @@
+import array
+import hashlib
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+
+import cannon_constants as const
+from diagnostics import get_logger
+
+log = get_logger("sim")
+
+# Levels Module: the levels as data. const.LEVELS_FILE (JSON) describes each level: its background, the colour of
+# the text drawn over it, how many bodies of each type it holds and the regions and speeds they spawn with, or a
+# fixed layout of bodies. Keys missing from a level are taken from the file's "defaults".
+# The loader validates the file and precompiles it: the positions of `variants` layouts per level are generated
+# once (rejection sampling for the targets) and stored in the compact binary const.LEVELS_CACHE, rebuilt whenever
+# the file changes. Starting a level then only picks one of its stored layouts and draws the velocities, so load
+# time does not depend on how hard the placement rules are to satisfy. Free of Kivy and of the simulation.
+#
+# Cache format (little endian): header "CNLV", version (u8), SHA-256 of the level file and the field geometry,
+# level count (u16), then for each level: background path length (u8), text colour (u8), target speed, target
+# minimum speed and obstacle speed (f32 each), body count and variant count (u16 each), the background path
+# (UTF-8), one record per body (type code u8, velocity drawn at start u8, fixed velocity f32 x 2) and the
+# positions of every variant (i16 x 2 per body).
+
+MAGIC = b"CNLV"
+VERSION = 1
+HEADER = struct.Struct("<4sB32sH")
+LEVEL = struct.Struct("<BBfffHH")
+BODY = struct.Struct("<BBff")
+
+BODY_TYPES = ("target", "wormhole", "mirror", "perpetio", "rock")     # also the order bodies are spawned in
+TEXT_COLORS = {"light": (1, 1, 1, 1), "dark": (0, 0, 0, 1)}
+LEVEL_KEYS = {"background", "text_color", "counts", "variants", "targets", "obstacles", "layout"}
+MAX_ATTEMPTS = 10000    # positions tried per target before a level is rejected as impossible to place
+
+
+# Level Class: one compiled level. `bodies` holds (type, velocity drawn at start, fixed velocity) in spawn order,
+# `positions` the x, y of every body of every variant, one variant after the other.
+
+class Level:
+    def __init__(self, number, background, text_color, bodies, positions, variants,
+                 target_speed=5, target_min_speed=1, obstacle_speed=5):
+        self.number = number
+        self.background = background
+        self.text_color = text_color
+        self.bodies = bodies
+        self.positions = positions
+        self.variants = variants
+        self.target_speed = target_speed
+        self.target_min_speed = target_min_speed
+        self.obstacle_speed = obstacle_speed
+
+    def counts(self):
+        # number of bodies of each type
+        counts = dict.fromkeys(BODY_TYPES, 0)
+        for body_type, _, _ in self.bodies:
+            counts[body_type] += 1
+        return counts
+
+    def layout(self, rng=random):
+        # the bodies of one start of the level as (type, position, velocity) in spawn order, one of the stored
+        # variants picked with rng. The velocity is None when it is drawn at start (simulation.World.populate draws
+        # it, within target_speed / obstacle_speed).
+        base = rng.randrange(self.variants) * len(self.bodies) * 2
+        positions = self.positions
+        return [(body_type, [positions[base + 2 * index], positions[base + 2 * index + 1]], None if drawn else velocity)
+                for index, (body_type, drawn, velocity) in enumerate(self.bodies)]
+
+
+def _region(spec, name, number):
+    region = spec.get("region")
+    if not isinstance(region, list) or len(region) != 4 or not all(isinstance(v, int) for v in region):
+        raise ValueError(f"level {number}: the {name} region must be four integers [x0, y0, x1, y1]")
+    x0, y0, x1, y1 = region
+    if not (0 <= x0 <= x1 <= const.SCREEN_WIDTH and 0 <= y0 <= y1 <= const.SCREEN_HEIGHT):
+        raise ValueError(f"level {number}: the {name} region {region} is not inside the "
+                         f"{const.SCREEN_WIDTH}x{const.SCREEN_HEIGHT} field")
+    return region
+
+
+def _number(spec, key, name, number, minimum=0, maximum=float("inf")):
+    value = spec.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not minimum <= value <= maximum:
+        raise ValueError(f"level {number}: {name} {key} must be a number from {minimum} to {maximum}, not {value!r}")
+    return value
+
+
+def _layout(bodies, number):
+    # a fixed layout: [{"type": ..., "position": [x, y], "velocity": [vx, vy]}, ...], the velocity being drawn at
+    # start when left out
+    if not isinstance(bodies, list) or not bodies:
+        raise ValueError(f"level {number}: the layout must be a non-empty list of bodies")
+    checked = []
+    for index, body in enumerate(bodies, 1):
+        if not isinstance(body, dict) or body.get("type") not in BODY_TYPES:
+            raise ValueError(f"level {number}: body {index} of the layout needs a type among {BODY_TYPES}")
+        position = body.get("position")
+        if (not isinstance(position, list) or len(position) != 2 or not all(isinstance(v, int) for v in position)
+                or not (0 <= position[0] <= const.SCREEN_WIDTH and 0 <= position[1] <= const.SCREEN_HEIGHT)):
+            raise ValueError(f"level {number}: body {index} of the layout needs a position of two integers "
+                             f"inside the field")
+        velocity = body.get("velocity")
+        if velocity is not None and (not isinstance(velocity, list) or len(velocity) != 2
+                                     or not all(isinstance(v, (int, float)) for v in velocity)):
+            raise ValueError(f"level {number}: body {index} of the layout has a velocity that is not two numbers")
+        checked.append((body["type"], position, velocity))
+    # spawn order: by type, in the layout's order within a type
+    return sorted(checked, key=lambda body: BODY_TYPES.index(body[0]))
+
+
+def validate(data, base=""):
+    # check a parsed level file and return each level's settings with the defaults filled in; a ValueError names
+    # the first level found wrong and what is wrong with it
+    if not isinstance(data, dict) or not isinstance(data.get("levels"), list) or not data["levels"]:
+        raise ValueError('the level file needs a non-empty "levels" list')
+    defaults = data.get("defaults", {})
+    if not isinstance(defaults, dict):
+        raise ValueError("the level file's defaults must be an object")
+    unknown = set(defaults) - LEVEL_KEYS
+    if unknown:
+        raise ValueError(f"defaults: unknown keys {sorted(unknown)}")
+    levels = []
+    for number, raw in enumerate(data["levels"], 1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"level {number}: not an object")
+        unknown = set(raw) - LEVEL_KEYS
+        if unknown:
+            raise ValueError(f"level {number}: unknown keys {sorted(unknown)}")
+        spec = {**defaults, **raw, "number": number}
+        for key in ("targets", "obstacles"):
+            spec[key] = {**defaults.get(key, {}), **raw.get(key, {})}
+
+        background = spec.get("background")
+        if not isinstance(background, str) or not os.path.isfile(os.path.join(base, background)):
+            raise ValueError(f"level {number}: background {background!r} not found")
+        if len(background.encode()) > 0xFF:
+            raise ValueError(f"level {number}: the background path is longer than 255 bytes")
+        if spec.get("text_color") not in TEXT_COLORS:
+            raise ValueError(f"level {number}: text_color must be one of {sorted(TEXT_COLORS)}")
+        targets, obstacles = spec["targets"], spec["obstacles"]
+        _region(targets, "targets", number)
+        _region(obstacles, "obstacles", number)
+        for key in ("min_cannon_distance", "min_separation", "speed"):
+            _number(targets, key, "targets", number)
+        _number(targets, "min_speed", "targets", number, maximum=targets["speed"])
+        _number(obstacles, "speed", "obstacles", number)
+
+        if "layout" in raw:
+            if "counts" in raw:
+                raise ValueError(f"level {number}: give either counts or a layout, not both")
+            spec["layout"] = _layout(raw["layout"], number)
+            counts = dict.fromkeys(BODY_TYPES, 0)
+            for body_type, _, _ in spec["layout"]:
+                counts[body_type] += 1
+            spec["variants"] = 1
+        else:
+            spec.pop("layout", None)
+            counts = spec.get("counts")
+            if not isinstance(counts, dict) or set(counts) - set(BODY_TYPES):
+                raise ValueError(f"level {number}: counts must map body types among {BODY_TYPES} to numbers")
+            counts = {body_type: counts.get(body_type, 0) for body_type in BODY_TYPES}
+            if not all(isinstance(count, int) and count >= 0 for count in counts.values()):
+                raise ValueError(f"level {number}: counts must be whole numbers, not {counts}")
+            variants = spec.get("variants")
+            if not isinstance(variants, int) or not 1 <= variants <= 0xFFFF:
+                raise ValueError(f"level {number}: variants must be a whole number from 1 to 65535")
+        if counts["target"] < 1:
+            raise ValueError(f"level {number}: a level needs at least one target")
+        if counts["wormhole"] % 2:
+            raise ValueError(f"level {number}: wormholes come in pairs, {counts['wormhole']} is odd")
+        spec["counts"] = counts
+        levels.append(spec)
+    return levels
+
+
+def _place_targets(spec, count, number, rng):
+    # rejection sampling: targets keep away from the cannon and from each other
+    x0, y0, x1, y1 = spec["region"]
+    cannon_x, cannon_y = const.CANNON_POSITION
+    placed = []
+    for _ in range(count):
+        for _ in range(MAX_ATTEMPTS):
+            x, y = rng.randint(x0, x1), rng.randint(y0, y1)
+            if math.hypot(x - cannon_x, y - cannon_y) < spec["min_cannon_distance"]:
+                continue
+            if any(math.hypot(x - px, y - py) < spec["min_separation"] for px, py in placed):
+                continue
+            placed.append((x, y))
+            break
+        else:
+            raise ValueError(f"level {number}: no room for {count} targets {spec['min_separation']} apart "
+                             f"in {spec['region']}, {spec['min_cannon_distance']} away from the cannon")
+    return placed
+
+
+def compile_level(spec):
+    # generate the stored layouts of a validated level. Each variant has a generator of its own, seeded by the
+    # level and variant numbers, so editing one level leaves the layouts of the others as they were.
+    number = spec["number"]
+    positions = array.array("h")
+    if "layout" in spec:
+        bodies = [(body_type, velocity is None, tuple(velocity or (0, 0))) for body_type, _, velocity in spec["layout"]]
+        for _, position, _ in spec["layout"]:
+            positions.extend(position)
+    else:
+        counts = spec["counts"]
+        bodies = [(body_type, True, (0, 0)) for body_type in BODY_TYPES for _ in range(counts[body_type])]
+        x0, y0, x1, y1 = spec["obstacles"]["region"]
+        for variant in range(spec["variants"]):
+            rng = random.Random(f"level-{number}/variant-{variant}")
+            for x, y in _place_targets(spec["targets"], counts["target"], number, rng):
+                positions.extend((x, y))
+            for _ in range(len(bodies) - counts["target"]):
+                positions.extend((rng.randint(x0, x1), rng.randint(y0, y1)))
+    targets, obstacles = spec["targets"], spec["obstacles"]
+    return Level(number, spec["background"], spec["text_color"], bodies, positions, spec["variants"],
+                 targets["speed"], targets["min_speed"], obstacles["speed"])
+
+
+def compile_levels(data, base=""):
+    return [compile_level(spec) for spec in validate(data, base)]
+
+
+def to_bytes(levels, digest):
+    out = bytearray(HEADER.pack(MAGIC, VERSION, digest, len(levels)))
+    colors = list(TEXT_COLORS)
+    for level in levels:
+        background = level.background.encode()
+        out += LEVEL.pack(len(background), colors.index(level.text_color), level.target_speed,
+                          level.target_min_speed, level.obstacle_speed, len(level.bodies), level.variants)
+        out += background
+        for body_type, drawn, (vx, vy) in level.bodies:
+            out += BODY.pack(BODY_TYPES.index(body_type), drawn, vx, vy)
+        positions = array.array("h", level.positions)
+        if sys.byteorder == "big":
+            positions.byteswap()
+        out += positions.tobytes()
+    return bytes(out)
+
+
+def from_bytes(data, digest=None):
+    # the levels stored in a cache, or None when it was compiled from another level file than `digest`'s
+    magic, version, stored, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} level cache")
+    if digest is not None and stored != digest:
+        return None
+    colors = list(TEXT_COLORS)
+    levels = []
+    offset = HEADER.size
+    for number in range(1, count + 1):
+        length, color, target_speed, target_min_speed, obstacle_speed, body_count, variants = \
+            LEVEL.unpack_from(data, offset)
+        offset += LEVEL.size
+        background = data[offset:offset + length].decode()
+        offset += length
+        bodies = []
+        for code, drawn, vx, vy in BODY.iter_unpack(data[offset:offset + body_count * BODY.size]):
+            bodies.append((BODY_TYPES[code], bool(drawn), (vx, vy)))
+        offset += body_count * BODY.size
+        positions = array.array("h")
+        size = body_count * 2 * variants * positions.itemsize
+        positions.frombytes(data[offset:offset + size])
+        if sys.byteorder == "big":
+            positions.byteswap()
+        offset += size
+        levels.append(Level(number, background, colors[color], bodies, positions, variants,
+                            target_speed, target_min_speed, obstacle_speed))
+    return levels
+
+
+def _digest(source):
+    # the cache depends on the level file and on the field geometry the layouts were placed in
+    geometry = f"{const.SCREEN_WIDTH}x{const.SCREEN_HEIGHT} {const.CANNON_POSITION}".encode()
+    return hashlib.sha256(source + geometry).digest()
+
+
+def load_levels(path=const.LEVELS_FILE, cache=const.LEVELS_CACHE):
+    # the compiled levels of the level file: from the cache when it is up to date, compiled (and cached) otherwise
+    with open(path, "rb") as f:
+        source = f.read()
+    return _load(source, path, cache)
+
+
+def _load(source, path, cache):
+    digest = _digest(source)
+    try:
+        with open(cache, "rb") as f:
+            levels = from_bytes(f.read(), digest)
+        if levels is not None:
+            return levels
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, IndexError, struct.error) as e:
+        log.warning("Level cache %s unreadable, recompiling: %s", cache, e)
+
+    start = time.perf_counter()
+    levels = compile_levels(json.loads(source), os.path.dirname(path))
+    log.info("Compiled %s levels from %s in %.1f ms", len(levels), path, (time.perf_counter() - start) * 1000)
+    try:
+        # written aside and renamed, so another game starting meanwhile never reads half a cache
+        temporary = f"{cache}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(to_bytes(levels, digest))
+        os.replace(temporary, cache)
+    except OSError as e:
+        log.warning("Could not write the level cache %s: %s", cache, e)
+    return levels
+
+
+_levels = None
+_levels_digest = None
+
+
+def get_levels():
+    # the game's levels, loaded on first use
+    global _levels, _levels_digest
+    if _levels is None:
+        with open(const.LEVELS_FILE, "rb") as f:
+            source = f.read()
+        _levels = _load(source, const.LEVELS_FILE, const.LEVELS_CACHE)
+        _levels_digest = _digest(source)
+    return _levels
+
+
+def levels_digest():
+    # digest of the level file the game's levels come from: a seed only gives the same layouts with the same file
+    get_levels()
+    return _levels_digest
+
+
+def level_count():
+    return len(get_levels())
+
+
+def get_level(number):
+    # level `number` (from 1); numbers past the last level get the last one
+    levels = get_levels()
+    return levels[min(max(number, 1), len(levels)) - 1]
+
+
+if __name__ == "__main__":
+    # validate and compile the level file, rewrite the cache and report what it holds
+    path = sys.argv[1] if len(sys.argv) > 1 else const.LEVELS_FILE
+    if os.path.exists(const.LEVELS_CACHE):
+        os.remove(const.LEVELS_CACHE)
+    try:
+        start = time.perf_counter()
+        levels = load_levels(path)
+        compiled = time.perf_counter() - start
+    except ValueError as e:
+        sys.exit(f"{path}: {e}")
+    start = time.perf_counter()
+    load_levels(path)
+    loaded = time.perf_counter() - start
+    for level in levels:
+        counts = ", ".join(f"{count} {body_type}" for body_type, count in level.counts().items() if count)
+        print(f"level {level.number}: {level.background}, {level.variants} layouts of {counts}")
+    print(f"{const.LEVELS_CACHE}: {os.path.getsize(const.LEVELS_CACHE)} bytes, compiled in {compiled * 1000:.1f} ms, "
+          f"loaded in {loaded * 1000:.2f} ms")
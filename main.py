@@ -1,9 +1,6 @@
-import random
-import math
-
 from kivy.app import App
 from kivy.clock import Clock
-from kivy.graphics import Color, Rectangle, Line
+from kivy.graphics import Color, Rectangle, Mesh
 from kivy.uix.widget import Widget
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.floatlayout import FloatLayout
@@ -12,13 +9,27 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.image import Image
 from kivy.uix.popup import Popup
 from kivy.uix.label import Label
-from kivy.uix.scrollview import ScrollView
 
 import cannon_constants as const
+from assets import assets, backgrounds, field_variant
+from diagnostics import get_logger, setup_logging
+from hall_of_fame import Leaderboard, LeaderboardWriter
+from hall_of_fame_view import HallOfFameView
+from levels import TEXT_COLORS, get_level, level_count
 from cannon_logic import Cannon
-from projectile import Projectile
-from obstacle import Obstacle
-from target import Target
+from game_loop import GameLoop
+from projectile import ProjectilePool
+from obstacle import ObstacleBatch
+from profiler import profiler
+from replay import Replay, replay_path, PROJECTILE_TYPES, LEVEL, ROTATE, POWER, SELECT, SHOOT, RESET, TRAJECTORY, END
+from simulation import World, FixedTimestep, level_rng, new_game_seed
+from trajectory import TrajectoryCache
+
+ui_log = get_logger("ui")
+input_log = get_logger("input")
+trajectory_log = get_logger("trajectory")
+scores_log = get_logger("scores")
+assets_log = get_logger("assets")
 
 # Main Module
 
@@ -32,30 +43,34 @@ class CanGame(Widget):
         self.score = 0
         self.shots_left = 10
         self.projectiles = []
-        self.obstacles = []
+        self.world = World(profiler=profiler)
+        self.timestep = FixedTimestep()   # steps the world at const.PHYSICS_RATE whatever the frame rate
+        self.trajectory_cache = TrajectoryCache()   # kept across levels, the shot parameters repeat
+        self.projectile_pool = ProjectilePool()     # recycles projectile widgets between shots
+        self.obstacle_batch = ObstacleBatch()   # draws every obstacle and target of the level
+        self.level_snapshot = []    # obstacle state at level start, restored by reset_level
         self.selected_projectile = "bullet"
         self.level = 1
+        self.seed = new_game_seed()   # every level layout of this game derives from it
+        self.replay = None            # input recording of the game in progress, saved when it ends
+        self.leaderboard = Leaderboard(read_only=True)   # reads, for the Hall of Fame popup
+        self.leaderboard_writer = LeaderboardWriter()    # writes, on its own thread
+        self.leaderboard_writer.import_text()            # no-op after the first start
         self.angle = 45
         self.velocity = 50
         self.cannon = None 
         self.error_label = None
         self.game_over = False
         self.paused = False
+        self.show_profiler = False   # frame-time overlay, toggled with F3 during a level
 
-        # schedule the main update loop
-        Clock.schedule_interval(self.update, 1 / 120)
-
-        # define level backgrounds
-        self.lvl_bg = {
-            1: "images/1_level.jpg",
-            2: "images/cannon_africa.jpg",
-            3: "images/cannon_america.jpg"
-        }
+        # the main update loop is owned by a single handle and started when a level begins
+        self.loop = GameLoop(self.update)
 
         # initialize the default background
         with self.canvas.before:
             self.background = Rectangle(
-                source="images/choice_background.png",
+                source=field_variant("images/choice_background.png"),
                 pos=self.pos, size=self.size
             )
         # bind size and position changes to update the background
@@ -76,7 +91,7 @@ class CanGame(Widget):
         )
         # create the continue button for nickname entry
         self.bgbutton = Button(
-            background_normal="images/buttons/immagine_continue.jpg",
+            background_normal=assets.source("images/buttons/immagine_continue.jpg"),
             size_hint=(None, None),
             size=(230, 188),
             pos_hint={"center_x": 0.5, "center_y": 0.4}
@@ -92,9 +107,9 @@ class CanGame(Widget):
         self.deb_wid("background Button", self.bgbutton)
 
         if self.cannon:
-            print(f"Cannon initialized at position: {self.cannon.position}")
+            ui_log.debug("Cannon initialized at position: %s", self.cannon.position)
         else:
-            print("Cannon not initialized yet.")
+            ui_log.debug("Cannon not initialized yet.")
 
     def resize(self, *args):
         # update the layout size when the widget size changes
@@ -105,6 +120,14 @@ class CanGame(Widget):
         self.background.pos = self.pos
         self.background.size = self.size
 
+    def set_background(self, path):
+        # swap the background, using the texture prefetched on a worker thread when it is ready
+        texture = backgrounds.texture(path)
+        if texture is not None:
+            self.background.texture = texture
+        else:
+            self.background.source = field_variant(path)
+
 # FOR THE INITIALIZATION OF THE GAME
 
     def start(self, instance):
@@ -153,15 +176,15 @@ class CanGame(Widget):
         if self.cannon:
             self.remove_widget(self.cannon)
             self.cannon = None 
-        print("Layout children before clearing:", self.layout.children)
+        ui_log.debug("Layout children before clearing: %s", self.layout.children)
 
         # update background and display the main menu
-        self.background.source = "images/homescreen_background.jpg"
+        self.set_background("images/homescreen_background.jpg")
         self.layout.clear_widgets()
 
         # create and bind the main menu buttons
         self.bgbutton = Button(
-            background_normal="images/buttons/play_button.png",
+            background_normal=assets.source("images/buttons/play_button.png"),
             size_hint=(None, None),
             size=(350, 185),
             pos_hint={"center_x": 0.5, "center_y": 0.2}
@@ -169,7 +192,7 @@ class CanGame(Widget):
         self.bgbutton.bind(on_press=self.go_to_projectile_screen)
 
         self.hofbutton = Button(
-            background_normal="images/buttons/immagine_hof copia 2.jpeg",
+            background_normal=assets.source("images/buttons/immagine_hof copia 2.jpeg"),
             size_hint=(None, None),
             size=(200, 54),
             pos_hint={"center_x": 0.9, "center_y": 0.9}
@@ -177,7 +200,7 @@ class CanGame(Widget):
         self.hofbutton.bind(on_press=self.show_hall_of_fame)
 
         self.help_button = Button(
-            background_normal="images/buttons/help_button.jpeg",
+            background_normal=assets.source("images/buttons/help_button.jpeg"),
             size_hint=(None, None),
             size=(200, 55),
             pos_hint={"center_x": 0.1, "center_y": 0.9}
@@ -190,15 +213,15 @@ class CanGame(Widget):
 
     def init_game(self, instance=None):
         # initialize game level; update background and state accordingly
-        print(f"backgrounding level {self.level}!")
+        ui_log.info("Starting level %s", self.level)
         self.state = f"level_{self.level}"
 
         if hasattr(self, 'background'):
-            self.background.source = self.lvl_bg.get(self.level, "")
+            self.set_background(get_level(self.level).background)
         else:
             with self.canvas.before:
                 self.background = Rectangle(
-                    source=self.lvl_bg.get(self.level, ""),
+                    source=field_variant(get_level(self.level).background),
                     pos=self.pos,
                     size=self.size
                 )
@@ -206,25 +229,31 @@ class CanGame(Widget):
 
         self.layout.clear_widgets()
 
+        # decode the next level's background while this one is played
+        if self.level < level_count():
+            backgrounds.prefetch(get_level(self.level + 1).background)
+
         # initialize the cannon if not present
         if not self.cannon:
             self.cannon = Cannon(position=[100, 150], angle=45)
+            ui_log.debug("Cannon initialized at position: %s", self.cannon.position)
+        if self.cannon.parent is None:
             self.add_widget(self.cannon)
-            print(f"Cannon initialized at position: {self.cannon.position}")
 
-        self.cannon.position = [100, 190]
+        self.cannon.position = list(const.CANNON_POSITION)
         self.cannon.angle = 45
+        self.cannon.rotation.angle = self.cannon.angle
 
         # generate obstacles for the current level
         self.initialize_obstacles()
 
-        # draw the score background and label
-        with self.canvas.before:
-            Color(0.74, 0.53, 0.33, 1)  
-            self.score_background = Rectangle(
-                size=(360, 50), 
-                pos=(self.width * 0.005, self.height * 0.94)
-            )
+        # draw the score background (once, it is hidden between games) and label
+        if not hasattr(self, 'score_background'):
+            with self.canvas.before:
+                Color(0.74, 0.53, 0.33, 1)
+                self.score_background = Rectangle()
+        self.score_background.size = (360, 50)
+        self.score_background.pos = (self.width * 0.005, self.height * 0.94)
 
         self.score_text = f"Score: {self.score}   Shots Left: {self.shots_left}"
         self.score_label = Label(
@@ -238,23 +267,35 @@ class CanGame(Widget):
         )
         self.layout.add_widget(self.score_label)
 
-        # display a label for current angle and velocity (color changes based on level)
-        if self.level == 1:
-            param_color = (1, 1, 1, 1)
-        else:
-            param_color = (0, 0, 0, 1)
+        # display a label for current angle and velocity (color readable on the level's background)
+        param_color = TEXT_COLORS[get_level(self.level).text_color]
         self.param_label = Label(
-            text=f"Angle: {self.cannon.get_angle()}\nVelocity: {self.velocity}",
+            text=self.param_text(),
             size_hint=(None, None),
-            size=(200, 50),
+            size=(200, 75),
             pos_hint={"center_x": 0.065, "top": 0.91},
             color=param_color,
         )
         self.layout.add_widget(self.param_label)
 
+        # frame-time overlay next to the parameters, hidden until F3 is pressed
+        self.profile_label = Label(
+            text=self.overlay_text(),
+            size_hint=(None, None),
+            size=(320, 220),
+            pos_hint={"x": 0.17, "top": 0.93},
+            halign="left",
+            valign="top",
+            font_size='12sp',
+            color=param_color,
+            opacity=1 if self.show_profiler else 0,
+        )
+        self.profile_label.text_size = self.profile_label.size
+        self.layout.add_widget(self.profile_label)
+
         # create and add pause and help buttons
         self.pause_button = Button(
-            background_normal="images/buttons/immagine_select.jpg",
+            background_normal=assets.source("images/buttons/immagine_select.jpg"),
             size_hint=(None, None),
             size=(200, 55),
             pos_hint={"center_x": 0.9, "center_y": 0.89}
@@ -263,7 +304,7 @@ class CanGame(Widget):
         self.layout.add_widget(self.pause_button)
 
         self.help_button = Button(
-            background_normal="images/buttons/help_button.jpeg",
+            background_normal=assets.source("images/buttons/help_button.jpeg"),
             size_hint=(None, None),
             size=(200, 55),
             pos_hint={"center_x": 0.9, "center_y": 0.96}
@@ -273,7 +314,7 @@ class CanGame(Widget):
 
         # create reset and trajectory preview buttons
         self.reset_button = Button(
-            background_normal="images/buttons/immagine_reset.jpg",
+            background_normal=assets.source("images/buttons/immagine_reset.jpg"),
             size_hint=(None, None),
             size=(200, 55),
             pos_hint={"center_x": 0.9, "center_y": 0.82}
@@ -282,7 +323,7 @@ class CanGame(Widget):
         self.layout.add_widget(self.reset_button)
 
         self.trajectory_button = Button(
-            background_normal="images/buttons/Immagine_traj.jpeg",
+            background_normal=assets.source("images/buttons/Immagine_traj.jpeg"),
             size_hint=(None, None),
             size=(200, 55),
             pos_hint={"center_x": 0.9, "center_y": 0.75}
@@ -293,11 +334,12 @@ class CanGame(Widget):
         # store the base score at level start for resets
         self.level_base_score = self.score
 
-        Clock.schedule_interval(self.update, 1 / 120)
+        self.loop.start()
 
     def deb_wid(self, name, widget):
         # debug helper to print widget properties
-        print(f"{name} - Size: {widget.size}, Pos: {widget.pos}, Size Hint: {widget.size_hint}, Pos Hint: {widget.pos_hint}")
+        ui_log.debug("%s - Size: %s, Pos: %s, Size Hint: %s, Pos Hint: %s",
+                     name, widget.size, widget.pos, widget.size_hint, widget.pos_hint)
 
 # RESTART AND RESET METHODS
 
@@ -305,9 +347,9 @@ class CanGame(Widget):
         # dismiss the game over popup and restart the game completely.
         if popup:
             popup.dismiss()
-            print("Game over popup dismissed.")
+            ui_log.debug("Game over popup dismissed.")
         else:
-            print("No popup instance provided to restart().")
+            ui_log.warning("No popup instance provided to restart().")
 
         if hasattr(self, 'last_proj_event') and self.last_proj_event is not None:
             self.last_proj_event.cancel()
@@ -319,44 +361,10 @@ class CanGame(Widget):
         Clock.schedule_once(lambda dt: self._do_restart(), 0.1)
 
     def reset_level(self, instance):
-        # Reset positions for obstacles that are not "rock" or "target"
-        for obstacle in self.obstacles:
-            if obstacle.obstacle_type not in ["rock", "target"] and hasattr(obstacle, 'initial_pos'):
-                obstacle.pos = obstacle.initial_pos[:]            
-                obstacle.position = obstacle.initial_pos[:]         
-
-        # remove and recreate obstacles of type "rock" (non-scoring obstacles)
-        rocks_to_remove = [obs for obs in self.obstacles if obs.obstacle_type == "rock"]
-        for rock in rocks_to_remove:
-            if rock in self.obstacles:
-                self.obstacles.remove(rock)
-            if rock.parent:
-                rock.parent.remove_widget(rock)
-        if hasattr(self, 'initial_rock_data'):
-            for pos, size in self.initial_rock_data:
-                new_rock = Obstacle("rock", self, image="images/small_images/immagineghianda.png", pos=pos, size=size)
-                new_rock.initial_pos = pos[:]      
-                new_rock.position = pos[:]         
-                new_rock.pos = (pos[0] - size[0] // 2, pos[1] - size[1] // 2)
-                self.obstacles.append(new_rock)
-                self.layout.add_widget(new_rock)
-                if new_rock.parent is None:
-                    self.layout.add_widget(new_rock)
-
-        # remove and recreate obstacles of type "target" (scoring targets)
-        targets_to_remove = [obs for obs in self.obstacles if obs.obstacle_type == "target"]
-        for target in targets_to_remove:
-            if target in self.obstacles:
-                self.obstacles.remove(target)
-            if target.parent:
-                target.parent.remove_widget(target)
-        if hasattr(self, 'initial_target_data'):
-            for pos, size in self.initial_target_data:
-                new_target = Target(self, image="images/small_images/cursor_image.png", pos=pos, size=size, movable=True)
-                self.obstacles.append(new_target)
-                self.layout.add_widget(new_target)
-                if new_target.parent is None:
-                    self.layout.add_widget(new_target)
+        # restore every obstacle to its level-start state in place: same bodies, nothing reallocated
+        self.world.restore(self.level_snapshot)
+        self.obstacle_batch.update(self.world.obstacles)
+        self.record(RESET)
 
         # reset projectiles and adjust score based on the level's base score minus penalty
         self.shots_left = 10
@@ -365,7 +373,7 @@ class CanGame(Widget):
         self.score_label.text = f"Score: {self.score}   Shots Left: {self.shots_left}"
 
         # Display a temporary penalty label
-        penalty_color = (0, 0, 0, 1) if self.level > 1 else (1, 1, 1, 1)
+        penalty_color = TEXT_COLORS[get_level(self.level).text_color]
         penalty_label = Label(
             text="As a penalty, 15 points have been removed.",
             size_hint=(None, None),
@@ -379,26 +387,29 @@ class CanGame(Widget):
 
     def _do_restart(self):
         # reset game state (except nickname) and show a welcome message before returning to the main menu
-        self.clear_widgets()
-        self.canvas.before.clear()
-        self.projectiles = []
-        self.obstacles = []
-        self.cannon = None
+        self.loop.stop()
+        self.paused = False
+        for projectile in self.projectiles[:]:
+            self.remove_projectile(projectile)
+        self.obstacle_batch.clear()
+        self.level_snapshot = []
+        self.world = World(profiler=profiler)
+        self.replay = None
+
+        # keep the widget tree and canvas: detach what belongs to the game, hide the score box and reuse the layout
+        for child in self.children[:]:
+            if child is not self.layout:
+                self.remove_widget(child)
+        self.layout.clear_widgets()
+        if hasattr(self, 'score_background'):
+            self.score_background.size = (0, 0)
+        self.set_background("images/choice_background.png")
         self.score = 0
         self.shots_left = 10
         self.game_over = False  
         self.level = 1         
+        self.seed = new_game_seed()
         self.state = "restart" 
-        with self.canvas.before:
-            self.background = Rectangle(
-                source="images/choice_background.png",
-                pos=self.pos,
-                size=self.size
-            )
-        self.bind(size=self.update_background, pos=self.update_background)
-        self.layout = FloatLayout(size=self.size)
-        self.bind(size=self.resize)
-        self.add_widget(self.layout)
 
         # create a welcome label using the stored nickname
         from kivy.uix.label import Label
@@ -422,12 +433,12 @@ class CanGame(Widget):
 
     def show_main_menu(self):
         # display the main menu with Play, Hall of Fame, and Help buttons
-        self.background.source = "images/homescreen_background.jpg"
+        self.set_background("images/homescreen_background.jpg")
         self.layout.clear_widgets()
 
         # create the Play, Hall fo fame and Help buttons
         self.bgbutton = Button(
-            background_normal="images/buttons/play_button.png",
+            background_normal=assets.source("images/buttons/play_button.png"),
             size_hint=(None, None),
             size=(350, 185),
             pos_hint={"center_x": 0.5, "center_y": 0.2}
@@ -435,7 +446,7 @@ class CanGame(Widget):
         self.bgbutton.bind(on_press=self.go_to_projectile_screen)
 
         self.hofbutton = Button(
-            background_normal="images/buttons/immagine_hof copia 2.jpeg",
+            background_normal=assets.source("images/buttons/immagine_hof copia 2.jpeg"),
             size_hint=(None, None),
             size=(200, 54),
             pos_hint={"center_x": 0.9, "center_y": 0.9}
@@ -443,7 +454,7 @@ class CanGame(Widget):
         self.hofbutton.bind(on_press=self.show_hall_of_fame)
 
         self.help_button = Button(
-            background_normal="images/buttons/help_button.jpeg",
+            background_normal=assets.source("images/buttons/help_button.jpeg"),
             size_hint=(None, None),
             size=(200, 55),
             pos_hint={"center_x": 0.1, "center_y": 0.9}
@@ -460,11 +471,11 @@ class CanGame(Widget):
         # display the projectile selection screen
         self.state = "choose_projectile"
         self.layout.clear_widgets()
-        self.background.source = "images/trajectory_choice.jpg"
+        self.set_background("images/trajectory_choice.jpg")
 
         # create bullet, bomb and laser's selection buttons 
         self.bullet_button = Button(
-            background_normal="images/buttons/immagine_bullet.jpeg",
+            background_normal=assets.source("images/buttons/immagine_bullet.jpeg"),
             size_hint=(None, None),
             size=(350, 285),
             pos_hint={"center_x": 0.2, "center_y": 0.4}
@@ -472,7 +483,7 @@ class CanGame(Widget):
         self.bullet_button.bind(on_press=lambda x: self.sel_proj("bullet"))
 
         self.bombshell_button = Button(
-            background_normal="images/buttons/immagine_bomb.jpg",
+            background_normal=assets.source("images/buttons/immagine_bomb.jpg"),
             size_hint=(None, None),
             size=(350, 285),
             pos_hint={"center_x": 0.5, "center_y": 0.4}
@@ -480,7 +491,7 @@ class CanGame(Widget):
         self.bombshell_button.bind(on_press=lambda x: self.sel_proj("bombshell"))
 
         self.laser_button = Button(
-            background_normal="images/buttons/immagine_laser.jpeg",
+            background_normal=assets.source("images/buttons/immagine_laser.jpeg"),
             size_hint=(None, None),
             size=(350, 285),
             pos_hint={"center_x": 0.8, "center_y": 0.4}
@@ -490,12 +501,13 @@ class CanGame(Widget):
         self.layout.add_widget(self.bullet_button)
         self.layout.add_widget(self.bombshell_button)
         self.layout.add_widget(self.laser_button)
-        print("Projectile screen initialized with buttons for Bullet, Bombshell, and Laser.")
+        ui_log.debug("Projectile screen initialized with buttons for Bullet, Bombshell, and Laser.")
 
     def sel_proj(self, projectile_type):
         # set the selected projectile type and initialize or resume the game accordingly
         self.selected_projectile = projectile_type
-        print("Projectile selected:", projectile_type, "in state:", self.state)
+        self.record(SELECT, PROJECTILE_TYPES.index(projectile_type))
+        input_log.info("Projectile selected: %s in state: %s", projectile_type, self.state)
         if self.state.startswith("level_") and self.paused:
             self.resume_game()
         elif self.state == "choose_projectile":
@@ -506,21 +518,21 @@ class CanGame(Widget):
         # resume the game from the pause state
         if self.paused:
             self.paused = False
-            Clock.schedule_interval(self.update, 1/120)
+            self.loop.resume()
             if hasattr(self, 'pause_overlay') and self.pause_overlay:
                 self.remove_widget(self.pause_overlay)
                 self.pause_overlay = None
-            print("Game resumed with projectile:", self.selected_projectile)
+            ui_log.info("Game resumed with projectile: %s", self.selected_projectile)
 
     def shoot_projectile(self):
         # fire a projectile from the cannon if shots remain
         if self.shots_left <= 0:
-            print("No shots left! Game over.")
+            input_log.info("No shots left! Game over.")
             self.finished()
             return
         tip_position = self.cannon.get_tip_position()
-        print(f"Launching projectile from {tip_position}")
-        projectile = Projectile(
+        input_log.debug("Launching projectile from %s", tip_position)
+        projectile = self.projectile_pool.acquire(
             projectile_type=self.selected_projectile,
             start_position=tip_position
         )
@@ -528,293 +540,133 @@ class CanGame(Widget):
             angle=self.cannon.get_angle(),
             power=self.velocity
         )
+        self.world.add_projectile(projectile.body)
         self.projectiles.append(projectile)
         self.add_widget(projectile)
         self.shots_left -= 1
-        print(f"Shots left: {self.shots_left}")
+        self.record(SHOOT)
+        input_log.debug("Shots left: %s", self.shots_left)
         if self.shots_left == 0:
-            print("No shots remaining!")
+            input_log.info("No shots remaining!")
     
 # OBSTACLES GENERALIZATION AND COLLISION HANDLING
 
     def initialize_obstacles(self):
-        # generate obstacles for the current level based on level-specific configuration
-        self.obstacles = []
-        self.projectiles = []
+        # generate the level in the headless world, drawn by the obstacle batch
+        from kivy.core.window import Window
+        for projectile in self.projectiles[:]:
+            self.remove_projectile(projectile)
+        self.world = World(Window.width, Window.height, profiler=profiler)
+        self.timestep.reset()
+        counts = self.world.populate(self.level, level_rng(self.seed, self.level))
+
+        # a replay starts with the game; each level opens with the state the inputs that follow build on
+        if self.replay is None or self.level == 1:
+            try:
+                self.replay = Replay(self.seed, self.world.width, self.world.height)
+            except ValueError as e:
+                ui_log.warning("Game not recorded: %s", e)    # a GAME_SEED the replay format cannot hold
+                self.replay = None
+        self.record(LEVEL, self.level)
+        self.record(SELECT, PROJECTILE_TYPES.index(self.selected_projectile))
+        self.record(POWER, self.velocity)
+
+        if self.obstacle_batch.parent is None:
+            self.layout.add_widget(self.obstacle_batch)
+        self.obstacle_batch.update(self.world.obstacles)
+
+        # remember the level-start state so that reset_level can restore it in place
+        self.level_snapshot = self.world.snapshot()
+
+        ui_log.info("Obstacles initialized for level %s (seed %s): %s targets, %s rocks, %s wormholes, %s mirrors, "
+                    "%s perpetios.", self.level, self.seed, counts['target'], counts['rock'], counts['wormhole'],
+                    counts['mirror'], counts['perpetio'])
+
+    def sync_widgets(self, alpha=1.0):
+        # mirror the simulated state: redraw the obstacles, drop projectile widgets whose body is gone, move the others
+        self.obstacle_batch.update(self.world.obstacles, alpha)
+        for projectile in self.projectiles[:]:
+            if projectile.body.active:
+                projectile.sync(alpha)
+            else:
+                self.remove_projectile(projectile)
 
-        if self.level == 1:
-            num_targets = 4
-            num_rocks = 3
-            num_perpetio = 3
-            num_mirrors = 0
-            num_wormholes = 0
-        elif self.level == 2:
-            num_targets = 5
-            num_rocks = 3
-            num_perpetio = 3
-            num_mirrors = 2
-            num_wormholes = 0
-        elif self.level == 3:
-            num_targets = 6
-            num_rocks = 3
-            num_perpetio = 2
-            num_mirrors = 2
-            num_wormholes = 2  # One pair of wormholes
-        else:
-            num_rocks = 3
-            num_targets = 6
-            num_perpetio = 2
-            num_mirrors = 2
-            num_wormholes = 2
-
-        screen_padding = 50
-
-        def get_random_position():
-            return [
-                random.randint(screen_padding, const.SCREEN_WIDTH - screen_padding),
-                random.randint(screen_padding, const.SCREEN_HEIGHT - screen_padding)
-            ]
-        
-        def get_valid_target_position(self, min_distance=400, min_separation=200):
-            while True:
-                x = random.randint(100, const.SCREEN_WIDTH - 100)
-                y = random.randint(100, const.SCREEN_HEIGHT - 100)
-                distance = math.sqrt((x - 100) ** 2 + (y - 190) ** 2)
-                if distance < min_distance:
-                    continue
-            
-                too_close = any(math.sqrt((x - t.position[0]) ** 2 + (y - t.position[1]) ** 2) < min_separation for t in self.obstacles if isinstance(t, Target))
-                if not too_close:
-                    return [x, y]
-        
-        # create targets
-        for _ in range(num_targets):
-            target = Target(self, image="images/small_images/cursor_image.png", 
-                            pos=get_valid_target_position(self), size=(80, 80), movable=True)
-            if target.parent is None:
-                self.layout.add_widget(target)
-            self.obstacles.append(target)
-
-        # create wormholes in pairs
-        for _ in range(num_wormholes // 2):
-            wormhole1 = Obstacle("wormhole", self, image="images/small_images/immagine_wormhole.png",
-                                pos=get_random_position(), size=(50, 100))
-            wormhole1.initial_pos = wormhole1.position[:]  
-            wormhole2 = Obstacle("wormhole", self, image="images/small_images/immagine_wormhole.png",
-                                pos=get_random_position(), size=(50, 100))
-            wormhole2.initial_pos = wormhole2.position[:]
-            self.obstacles.extend([wormhole1, wormhole2])
-
-        # create mirrors
-        for _ in range(num_mirrors):
-            mirror = Obstacle("mirror", self, image="images/small_images/immaginespecchio.jpg",
-                            pos=get_random_position(), size=(8, 100))
-            mirror.initial_pos = mirror.position[:]
-            self.obstacles.append(mirror)
-
-        # create perpetio
-        for _ in range(num_perpetio):
-            perpetio = Obstacle("perpetio", self, image="images/small_images/immaginefarfalla.png",
-                                pos=get_random_position(), size=(80, 80))
-            perpetio.initial_pos = perpetio.position[:]
-            self.obstacles.append(perpetio)
-
-        # create rocks
-        for _ in range(num_rocks):
-            rock = Obstacle("rock", self, image="images/small_images/immagineghianda.png",
-                            pos=get_random_position(), size=(80, 80))
-            rock.initial_pos = rock.position[:]  
-            self.obstacles.append(rock)
-
-        # add every generated obstacle to the layout
-        for obstacle in self.obstacles:
-            if obstacle.parent is None:
-                self.layout.add_widget(obstacle)
-
-        # save initial rocks and target data for resets
-        self.initial_rock_data = [(rock.initial_pos, rock.size)
-                                for rock in self.obstacles if rock.obstacle_type == "rock"]
-        self.initial_target_data = [(obs.initial_pos, obs.size) 
-                                for obs in self.obstacles if obs.obstacle_type == "target"]
-
-        print(f"Obstacles initialized for level {self.level}: {num_targets} targets, {num_rocks} rocks, {num_wormholes} wormholes, {num_mirrors} mirrors, {num_perpetio} perpetios.")
-
-    def handle_collisions(self):
-        # process collisions between projectiles and obstacles
-        for obstacle in self.obstacles[:]:
-            for projectile in self.projectiles[:]:
-                if obstacle.collision(projectile):
-                    # wormhole logic: teleport the projectile using the paired wormhole
-                    if obstacle.obstacle_type == "wormhole" and not projectile.just_teleported:
-                        paired_wormhole = next(
-                            (o for o in self.obstacles if o.obstacle_type == "wormhole" and o != obstacle), None
-                        )
-                        if paired_wormhole:
-                            print(f"Paired wormhole found: {paired_wormhole}")
-                            offset = paired_wormhole.radius + 10
-                            exit_position = [
-                                paired_wormhole.position[0] + offset,
-                                paired_wormhole.position[1] + offset
-                            ]
-                            projectile.position = exit_position
-                            projectile.image_widget.pos = (
-                                exit_position[0] - projectile.radius,
-                                exit_position[1] - projectile.radius
-                            )
-                            projectile.just_teleported = True
-                            projectile.teleport_cooldown = 0.5
-                            print(f"Exit position calculated: {exit_position}")
-                            print(f"Projectile velocity after teleport: {projectile.velocity}")
-
-                    # mirror logic: reflect the projectile
-                    elif obstacle.obstacle_type == "mirror":
-                        obstacle.projectile_reflection(projectile)
-                        if projectile.projectile_type in ["bullet", "bombshell"]:
-                            self.remove_projectile(projectile)
-
-                    # perpetio logic: destroy the projectile
-                    elif obstacle.obstacle_type == "perpetio":
-                        print(f"{projectile.projectile_type} destroyed upon hitting perpetio.")
-                        if projectile in self.projectiles:
-                            projectile.remove_widget(projectile.image_widget)
-                            self.projectiles.remove(projectile)
-
-                    # on-hit logic for obstacles 
-                    elif obstacle.on_hit(projectile):
-                        if projectile.projectile_type == "bombshell":
-                            # bombshell penetration: remove obstacles within BOMB_RADIUS of impact
-                            impact_point = projectile.position
-                            for obs in self.obstacles[:]:
-                                dist = math.sqrt((obs.position[0] - impact_point[0])**2 +
-                                                (obs.position[1] - impact_point[1])**2)
-                                if dist <= const.BOMB_RADIUS:
-                                    if obs.obstacle_type == "target":
-                                        self.score += 10
-                                    if hasattr(obs, 'image_widget'):
-                                        obs.remove_widget(obs.image_widget)
-                                    if obs in self.obstacles:
-                                        self.obstacles.remove(obs)
-                        else:
-                            if obstacle.obstacle_type == "target":
-                                self.score += 10
-                            if hasattr(obstacle, 'image_widget'):
-                                obstacle.remove_widget(obstacle.image_widget)
-                            if hasattr(projectile, 'image_widget'):
-                                projectile.remove_widget(projectile.image_widget)
-                            if obstacle in self.obstacles:
-                                self.obstacles.remove(obstacle)
-                            if projectile in self.projectiles:
-                                self.projectiles.remove(projectile)
-
-        # if no targets obstacles remain, trigger the congratulations popup
-        if not any(o.obstacle_type == "target" for o in self.obstacles):
-            print("Congratulations! All targets destroyed.")
-            if self.state != "congratulations":
-                self.congrat_sc()
+    def record(self, code, arg=0):
+        # add an input event to the replay, stamped with the physics step of the level it happened at
+        if self.replay is not None:
+            self.replay.record(self.world.steps, code, arg)
+
+    def save_replay(self):
+        # write the recording of the game that just ended; replay.py re-simulates it headless
+        if self.replay is None:
+            return
+        path = replay_path(self.seed)
+        try:
+            self.replay.save(path)
+            ui_log.info("Replay of seed %s saved to %s (%s bytes)", self.seed, path, len(self.replay.to_bytes()))
+        except OSError as e:
+            ui_log.error("Failed to save replay: %s", e)
+        self.replay = None
 
     def remove_projectile(self, projectile):
-        # remove the projectile widget and mark it as inactive
-        if hasattr(projectile, 'image_widget') and projectile.image_widget.parent:
-            projectile.image_widget.parent.remove_widget(projectile.image_widget)
+        # remove the projectile widget together with its body and hand the widget back to the pool
+        if projectile.parent:
+            projectile.parent.remove_widget(projectile)
         if projectile in self.projectiles:
             self.projectiles.remove(projectile)
-        projectile.active = False
+        self.world.remove_projectile(projectile.body)
+        self.projectile_pool.release(projectile)
 
     def on_key_down(self, window, key, scancode, codepoint, modifier):
         # handle key presses for shooting and cannon control
-        print(f"Key pressed: {key}")
+        input_log.debug("Key pressed: %s", key)
         if self.state.startswith("level_"):
             if key == 32:  # Spacebar to shoot
-                print("Shooting projectile")
+                input_log.debug("Shooting projectile")
                 self.shoot_projectile()
             elif key == 275:  # Right arrow to rotate down
-                print("Rotating cannon down")
+                input_log.debug("Rotating cannon down")
                 self.cannon.rotate("down")
+                self.record(ROTATE, self.cannon.angle)
             elif key == 276:  # Left arrow to rotate up
-                print("Rotating cannon up")
+                input_log.debug("Rotating cannon up")
                 self.cannon.rotate("up")
+                self.record(ROTATE, self.cannon.angle)
             elif key == 273:  # Up arrow key to increase velocity
                 self.velocity = min(self.velocity + 10, 100)
-                print(f"Velocity increased to {self.velocity}")
+                self.record(POWER, self.velocity)
+                input_log.debug("Velocity increased to %s", self.velocity)
             elif key == 274:  # Down arrow key to decrease velocity
                 self.velocity = max(self.velocity - 10, 10)
-                print(f"Velocity decreased to {self.velocity}")
+                self.record(POWER, self.velocity)
+                input_log.debug("Velocity decreased to %s", self.velocity)
+            elif key == 284:  # F3 to show or hide the frame-time overlay, measuring while it is shown
+                self.show_profiler = not self.show_profiler
+                self.profile_label.opacity = 1 if self.show_profiler else 0
+                profiler.enabled = self.show_profiler or const.PROFILE_ENABLED
 
 # HALL OF FAME AND HELP SCREEN 
 
     def show_hall_of_fame(self, instance):
-        # display the Hall of Fame popup with sorted entries
-        try:
-            with open("hall_of_fame.txt", "r") as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            lines = ["No Hall of Fame data found."]
-        if lines and "No Hall of Fame data found." not in lines[0]:
-            entries = []
-            for line in lines:
-                line = line.strip()
-                parts = line.split(',')
-                if len(parts) >= 2:
-                    try:
-                        score = int(parts[1].split(':')[1].strip())
-                    except (IndexError, ValueError):
-                        score = 0
-                    entries.append((line, score))
-                else:
-                    entries.append((line, 0))
-            # sort the entries by score descending
-            entries.sort(key=lambda x: x[1], reverse=True)
-            sorted_hof_data = "\n".join(entry[0] for entry in entries)
-        else:
-            sorted_hof_data = lines[0] if lines else "No Hall of Fame data found."
-        sorted_hof_data = "\n\n" + sorted_hof_data
-        
-        # create a label with white text
-        popup_content = Label(
-            text=sorted_hof_data,
-            size_hint_y=None,
-            color=(1, 1, 1, 1),
-            font_size='16sp',
-            halign="left",
-            valign="top",
-            padding=(0, 100)  
-        )
-        popup_content.text_size = (620, None)
-        popup_content.bind(texture_size=popup_content.setter('size'))
-        scroll_view = ScrollView(size_hint=(1, 1))
-        scroll_view.add_widget(popup_content)
+        # display the Hall of Fame popup: a virtualized list paged from the leaderboard, best entries first
         popup = Popup(
             title="",
-            content=scroll_view,
+            content=HallOfFameView(self.leaderboard, self.nickname),
             size_hint=(None, None),
             size=(750, 938),
             separator_height=0,
-            background="images/immagine_halloffame.jpeg"
+            background=field_variant("images/immagine_halloffame.jpeg")
         )
         popup.open()
 
     def save_to_hall_of_fame(self):
-        # save the current player's entry to the Hall of Fame if not already present
-        entry = f"Nickname: {self.nickname}, Score: {self.score}, Level: {self.level}"
-        try:
-            with open("hall_of_fame.txt", "r") as f:
-                lines = [line.strip() for line in f.readlines()]
-        except FileNotFoundError:
-            lines = []
-        
-        if entry in lines:
-            print("Duplicate entry found. Not saving to Hall of Fame.")
-            return
-        try:
-            with open("hall_of_fame.txt", "a") as f:
-                f.write(entry + "\n")
-            print("Player's score saved to Hall of Fame.")
-        except IOError as e:
-            print(f"Failed to save to Hall of Fame: {e}")
+        # queue the current player's entry for the Hall of Fame; the writer thread skips it if already present
+        self.leaderboard_writer.add(self.nickname, self.score, level=self.level, seed=self.seed)
+        scores_log.info("Player's score queued for the Hall of Fame.")
 
     def helpscreenshow(self, instance):
         # display the help screen popup
-        background = Image(source="images/help.jpeg", size_hint=(1, 1), allow_stretch=True, keep_ratio=True)
+        background = Image(source=field_variant("images/help.jpeg"), size_hint=(1, 1), allow_stretch=True, keep_ratio=True)
         help_popup = Popup(
             title="",
             content=background,
@@ -829,17 +681,18 @@ class CanGame(Widget):
     def show_trajectory(self):
         # if a trajectory is already being shown, do nothing
         if hasattr(self, 'traj_event') and self.traj_event:
-            print("Trajectory already active, returning.")
+            trajectory_log.debug("Trajectory already active, returning.")
             return
 
-        print("Showing trajectory for level", self.level)
+        trajectory_log.info("Showing trajectory for level %s", self.level)
+        self.record(TRAJECTORY)
         
         # deduct penalty points and update the score label
         self.score -= 10
         self.score_label.text = f"Score: {self.score}   Shots Left: {self.shots_left}"
 
         # display a temporary penalty label
-        penalty_color = (0, 0, 0, 1) if self.level >= 2 else (1, 1, 1, 1)
+        penalty_color = TEXT_COLORS[get_level(self.level).text_color]
         penalty_label = Label(
             text="As penalty, 10 points have been removed.",
             size_hint=(None, None),
@@ -862,50 +715,19 @@ class CanGame(Widget):
         )
         self.layout.add_widget(countdown_label)
 
-        # compute initial trajectory parameters based on the cannon's tip and current angle
-        start_pos = self.cannon.get_tip_position()
-        angle_rad = math.radians(self.cannon.get_angle())
-        if self.selected_projectile == "bombshell":
-            multiplier = 2
-        elif self.selected_projectile == "laser":
-            multiplier = 1
-        else:  # bullet
-            multiplier = 5
-        v0 = self.velocity * multiplier
-        v0x = v0 * math.cos(angle_rad)
-        v0y = v0 * math.sin(angle_rad)
-
-        # calculate t_max depending on the projectile type
-        if self.selected_projectile == "bombshell":
-            t_natural = 0.0
-            cumulative = 0.0
-            prev_point = start_pos
-            step = 0.1
-            while cumulative < const.BOMB_DRILL and t_natural < 10.0:
-                t_natural += step
-                x = start_pos[0] + v0x * t_natural
-                y = start_pos[1] + v0y * t_natural - 0.5 * 9.8 * t_natural * t_natural
-                current_point = (x, y)
-                cumulative += math.dist(prev_point, current_point)
-                prev_point = current_point
-            t_max = t_natural
-        elif self.selected_projectile == "laser":
-            t_max = const.LASER_DIST / const.LASER_VEL
-        else:  # bullet
-            t_max = 100000 / abs(v0x) if abs(v0x) > 0 else 15.0
-
-        print("Computed t_max:", t_max)
-        print("Cannon tip position:", start_pos)
+        trajectory_log.debug("Cannon tip position: %s", self.cannon.get_tip_position())
 
         # set the countdown time
         self.trajectory_time = 15.0
         countdown_label.text = str(int(self.trajectory_time))
 
-        # ensure the trajectory widget covers the entire layout
+        # ensure the trajectory widget covers the entire layout; its single mesh draws every dash of the preview
         if not hasattr(self, 'traj_widget'):
             self.traj_widget = Widget(size=self.layout.size, pos=self.layout.pos)
+            with self.traj_widget.canvas:
+                Color(1, 1, 1, 1)
+                self.traj_mesh = Mesh(mode="triangles")
         else:
-            self.traj_widget.canvas.clear()
             self.traj_widget.size = self.layout.size
             self.traj_widget.pos = self.layout.pos
 
@@ -914,49 +736,30 @@ class CanGame(Widget):
             self.traj_widget.parent.remove_widget(self.traj_widget)
         self.layout.add_widget(self.traj_widget)
 
-        self.traj_segments = []
-
         # define the function to update the trajectory preview
         def update_trajectory(dt):
-            self.traj_widget.canvas.clear()
-            self.traj_segments = []
-            current_start = self.cannon.get_tip_position()
-            current_angle = math.radians(self.cannon.get_angle())
-            if self.selected_projectile == "bombshell":
-                mult = 2
-            elif self.selected_projectile == "laser":
-                mult = 1
-            else:
-                mult = 5
-            current_v0 = self.velocity * mult
-            current_v0x = current_v0 * math.cos(current_angle)
-            current_v0y = current_v0 * math.sin(current_angle)
-            t = 0.0
-            step = 0.1
-            traj_points = []
-            while t <= t_max:
-                if self.selected_projectile != "laser":
-                    x = current_start[0] + current_v0x * t
-                    y = current_start[1] + current_v0y * t - 0.5 * 9.8 * t * t
-                else:
-                    x = current_start[0] + current_v0x * t
-                    y = current_start[1] + current_v0y * t
-                traj_points.append((x, y))
-                t += step
-            print("Trajectory points count:", len(traj_points))
-            dash_length_points = 5
-            gap_length_points = 3
-            i = 0
-            line_color = (1, 1, 1, 1)
-            with self.traj_widget.canvas:
-                Color(*line_color)
-                while i < len(traj_points) - 1:
-                    seg_points = []
-                    for p in traj_points[i:min(i + dash_length_points, len(traj_points))]:
-                        seg_points.extend(p)
-                    seg_line = Line(points=seg_points, width=1.5)
-                    self.traj_segments.append(seg_line)
-                    i += dash_length_points + gap_length_points
+            # dashes of the path predicted by stepping a copy of the world, reused from the cache while the shot
+            # parameters and the obstacles do not change; the mesh buffers are swapped in place, no canvas
+            # instruction is created per refresh
+            if not self.traj_event:
+                return False    # a preview finished on the worker after the countdown ended
+            with profiler.scope("trajectory"):
+                mesh = self.trajectory_cache.get(
+                    self.selected_projectile,
+                    self.cannon.get_tip_position(),
+                    self.cannon.get_angle(),
+                    self.velocity,
+                    self.world.width,
+                    self.world.height,
+                    world=self.world,
+                    on_ready=lambda: Clock.schedule_once(update_trajectory)
+                )
+            if mesh is None:
+                return True     # being computed on the worker; the current dashes stay until it is ready
+            vertices, indices = mesh
+            trajectory_log.debug("Trajectory segment count: %s", len(indices) // 6)
+            self.traj_mesh.vertices = vertices
+            self.traj_mesh.indices = indices
             return True
 
         self.traj_event = Clock.schedule_interval(update_trajectory, 0.2)
@@ -971,7 +774,8 @@ class CanGame(Widget):
                     self.traj_event.cancel()
                     self.traj_event = None
                 if hasattr(self, 'traj_widget'):
-                    self.traj_widget.canvas.clear()
+                    self.traj_mesh.vertices = []
+                    self.traj_mesh.indices = []
                 if countdown_label.parent:
                     self.layout.remove_widget(countdown_label)
                 return False
@@ -988,7 +792,7 @@ class CanGame(Widget):
         # advance to the next level and reset shots
         self.level += 1
         self.shots_left = 10
-        if self.level > 3:
+        if self.level > level_count():
             self.final_screen()
         else:
             self.init_game()
@@ -999,7 +803,7 @@ class CanGame(Widget):
             self.resume_game()
         else:
             self.paused = True
-            Clock.unschedule(self.update)
+            self.loop.pause()
             self.pause_overlay = FloatLayout(size=self.size)
             with self.pause_overlay.canvas.before:
                 Color(0, 0, 0, 0.6)  # Black with 60% opacity
@@ -1012,7 +816,7 @@ class CanGame(Widget):
             
             # create projectile selection buttons
             bullet_button = Button(
-                background_normal="images/buttons/immagine_bullet.jpeg",
+                background_normal=assets.source("images/buttons/immagine_bullet.jpeg"),
                 size_hint=(None, None),
                 size=(350, 285),
                 pos_hint={"center_x": 0.2, "center_y": 0.6}
@@ -1020,7 +824,7 @@ class CanGame(Widget):
             bullet_button.bind(on_press=lambda x: self.sel_proj("bullet"))
             
             bombshell_button = Button(
-                background_normal="images/buttons/immagine_bomb.jpg",
+                background_normal=assets.source("images/buttons/immagine_bomb.jpg"),
                 size_hint=(None, None),
                 size=(350, 285),
                 pos_hint={"center_x": 0.5, "center_y": 0.6}
@@ -1028,7 +832,7 @@ class CanGame(Widget):
             bombshell_button.bind(on_press=lambda x: self.sel_proj("bombshell"))
             
             laser_button = Button(
-                background_normal="images/buttons/immagine_laser.jpeg",
+                background_normal=assets.source("images/buttons/immagine_laser.jpeg"),
                 size_hint=(None, None),
                 size=(350, 285),
                 pos_hint={"center_x": 0.8, "center_y": 0.6}
@@ -1037,7 +841,7 @@ class CanGame(Widget):
             
             # Create a resume button that simply resumes the game without changing the projectile.
             resume_button = Button(
-                background_normal="images/buttons/immagine_resume.jpg",
+                background_normal=assets.source("images/buttons/immagine_resume.jpg"),
                 size_hint=(None, None),
                 size=(125, 40),
                 pos_hint={"center_x": 0.5, "center_y": 0.2}
@@ -1050,26 +854,49 @@ class CanGame(Widget):
             self.pause_overlay.add_widget(resume_button)
             
             self.add_widget(self.pause_overlay)
-            print("Game paused. Shots left:", self.shots_left)
+            ui_log.info("Game paused. Shots left: %s", self.shots_left)
+
+    def param_text(self):
+        # text of the parameter label: the shot parameters and the seed that reproduces this game
+        return f"Angle: {self.cannon.get_angle()}\nVelocity: {self.velocity}\nSeed: {self.seed}"
 
     def update_score_text(self):
         # update the score display text
         self.score_text = f"Score: {self.score}   Shots Left: {self.shots_left}"
 
+    def overlay_text(self):
+        # the F3 overlay: frame-time percentiles, then the counters of the game loop, the projectile pool and the
+        # trajectory preview cache
+        loop = self.loop.stats()
+        pool = self.projectile_pool.stats()
+        cache = self.trajectory_cache.stats()
+        lines = [profiler.overlay_text(),
+                 f"loop: {loop['frames']} frames, {loop['starts']} starts" + (", paused" if loop["paused"] else ""),
+                 f"pool: {pool['created']} created, in flight / free / max (bullet, bombshell, laser): "
+                 + ", ".join(f"{pool[kind]['in_use']}/{pool[kind]['free']}/{pool[kind]['high_water']}"
+                             for kind in PROJECTILE_TYPES),
+                 f"previews: {cache['size']} cached, {cache['hits']} hits / {cache['misses']} misses"
+                 + (f", {cache['pending']} computing" if cache["pending"] else "")]
+        return "\n".join(lines)
+
     def update(self, dt):
         # main update loop called on a fixed interval
         if not self.state.startswith("level_"):
             return
+        profiler.begin_frame()
 
-        for obstacle in self.obstacles:
-            obstacle.update(dt)
+        # step the headless world at its fixed rate and mirror its state on the widgets,
+        # interpolating between the last two physics steps so motion stays smooth at any frame rate
+        with profiler.scope("physics"):
+            self.score += self.timestep.advance(self.world, dt)
+        with profiler.scope("sync"):
+            self.sync_widgets(self.timestep.alpha)
+        profiler.count("entities", len(self.world.obstacles) + len(self.world.projectiles))
 
-        for projectile in self.projectiles[:]:
-            projectile.update(dt)
-            if not projectile.is_active():
-                self.projectiles.remove(projectile)
-
-        self.handle_collisions()
+        # if no targets remain, trigger the congratulations popup
+        if not self.world.targets_left() and self.state != "congratulations":
+            ui_log.info("Congratulations! All targets destroyed.")
+            self.congrat_sc()
 
         # if no shots remain and no projectiles are in flight, schedule game over check
         if self.shots_left <= 0 and not self.game_over:
@@ -1080,18 +907,19 @@ class CanGame(Widget):
         self.score_label.text = self.score_text
 
         if self.state.startswith("level_") and self.cannon:
-            self.param_label.text = f"Angle: {self.cannon.get_angle()}\nVelocity: {self.velocity}"
+            self.param_label.text = self.param_text()
+
+        profiler.end_frame()
+        # the overlay label is re-rendered only every few frames so it does not distort what it measures
+        if self.show_profiler and profiler.frames % const.PROFILE_OVERLAY_EVERY == 0:
+            self.profile_label.text = self.overlay_text()
 
     def final_screen(self):
         # display the full-screen final screen with winner entry and navigation buttons
-        print("Displaying Final Screen!")
-        entry = f"Nickname: {self.nickname}, Score: {self.score}, WINNER"
-        try:
-            with open("hall_of_fame.txt", "a") as f:
-                f.write(entry + "\n")
-            print("Winner entry saved to Hall of Fame.")
-        except IOError as e:
-            print(f"Failed to save winner entry: {e}")
+        ui_log.info("Displaying Final Screen!")
+        self.save_replay()
+        self.leaderboard_writer.add(self.nickname, self.score, seed=self.seed, winner=True)
+        scores_log.info("Winner entry queued for the Hall of Fame.")
 
         popup_content = FloatLayout(size=self.size)
 
@@ -1104,14 +932,14 @@ class CanGame(Widget):
         buttons_layout.pos_hint = {"center_x": 0.5, "y": 0.15}
 
         hof_button = Button(
-            background_normal="images/buttons/immagine_hof copia 2.jpeg",
+            background_normal=assets.source("images/buttons/immagine_hof copia 2.jpeg"),
             size_hint=(None, None),
             size=(200, 54)
         )
         hof_button.bind(on_press=self.show_hall_of_fame)
         
         shutdown_button = Button(
-            background_normal="images/buttons/immagine_shutdown.jpg",
+            background_normal=assets.source("images/buttons/immagine_shutdown.jpg"),
             size_hint=(None, None),
             size=(200, 51)
         )
@@ -1126,14 +954,16 @@ class CanGame(Widget):
             content=popup_content,
             size_hint=(1, 1),
             separator_height=0,
-            background="images/final_image.jpg"
+            background=field_variant("images/final_image.jpg")
         )
         popup.open()
 
     def finished(self):
         # trigger the game over sequence and display the Game Over popup
-        print("Game Over! You ran out of shots.")
-        Clock.unschedule(self.update)
+        ui_log.info("Game Over! You ran out of shots.")
+        self.loop.stop()
+        self.record(END, self.score)
+        self.save_replay()
         self.save_to_hall_of_fame()
         popup_width, popup_height = 450, 468
 
@@ -1148,21 +978,21 @@ class CanGame(Widget):
         buttons_layout.pos_hint = {"center_x": 0.5, "y": 0.05}
         
         restart_button = Button(
-            background_normal="images/buttons/immagine_restart copia.jpg",
+            background_normal=assets.source("images/buttons/immagine_restart copia.jpg"),
             size_hint=(None, None),
             size=(200, 51)
         )
         restart_button.bind(on_press=lambda instance: self.restart(popup))
         
         shutdown_button = Button(
-            background_normal="images/buttons/immagine_shutdown.jpg",
+            background_normal=assets.source("images/buttons/immagine_shutdown.jpg"),
             size_hint=(None, None),
             size=(200, 51)
         )
         shutdown_button.bind(on_press=lambda instance: self.shutdown())
     
         hof_button = Button(
-            background_normal="images/buttons/immagine_hof copia 2.jpeg",
+            background_normal=assets.source("images/buttons/immagine_hof copia 2.jpeg"),
             size_hint=(None, None),
             size=(200, 51)
         )
@@ -1180,20 +1010,21 @@ class CanGame(Widget):
             size_hint=(None, None),
             size=(popup_width, popup_height),
             separator_height=0,
-            background="images/gameover.png"
+            background=field_variant("images/gameover.png")
         )
         popup.open()
 
     def check_last_projectile(self, dt):
-        if self.state.startswith("level_") and len(self.projectiles) == 0 and any(o.obstacle_type == "target" for o in self.obstacles):
+        if self.state.startswith("level_") and len(self.projectiles) == 0 and self.world.targets_left():
             self.game_over = True
             self.finished()
         self.last_proj_event = None
 
     def congrat_sc(self):
         # display the Congratulations popup and automatically proceed to the next level
-        print("Displaying Congratulations Screen")
+        ui_log.info("Displaying Congratulations Screen")
         self.state = "congratulations"
+        self.record(END, self.score)
         # remove any residual projectiles
         for p in self.projectiles[:]:
             self.remove_projectile(p)
@@ -1203,7 +1034,7 @@ class CanGame(Widget):
         popup_content = FloatLayout(size=(popup_width, popup_height))
 
         next_button = Button(
-            background_normal="images/buttons/hall_button.png",
+            background_normal=assets.source("images/buttons/hall_button.png"),
             size_hint=(None, None),
             size=(90, 72),
             pos_hint={"center_x": 0.5, "y": 0.05}
@@ -1220,7 +1051,7 @@ class CanGame(Widget):
             size_hint=(None, None),
             size=(popup_width, popup_height),
             separator_height=0,
-            background="images/congr.png"
+            background=field_variant("images/congr.png")
         )
         popup.open()
 
@@ -1250,16 +1081,49 @@ class scores(BoxLayout):
         self.bg.pos = self.pos
 
    
+# screens and popups shown outside the levels, prefetched at startup
+MENU_BACKGROUNDS = [
+    "images/homescreen_background.jpg",
+    "images/trajectory_choice.jpg",
+    "images/immagine_halloffame.jpeg",
+    "images/help.jpeg",
+    "images/congr.png",
+    "images/gameover.png",
+    "images/final_image.jpg",
+]
+
+
 class CannonApp(App):
     def build(self):
+        # load every sprite and button texture before the first screen is built
+        assets.preload()
+        assets_log.info("Textures preloaded: %s KiB", assets.report()["total_bytes"] // 1024)
         game = CanGame()
+        # decode the menu screens and the first level's background in the background
+        for path in MENU_BACKGROUNDS + [get_level(1).background]:
+            backgrounds.prefetch(path)
         game.size = (const.SCREEN_WIDTH, const.SCREEN_HEIGHT)
         from kivy.core.window import Window
         Window.bind(on_key_down=game.on_key_down)  # bind key events globally
         return game
 
+    def on_stop(self):
+        # keep the recording of a game left unfinished, then write the frame-time trace (when profiling is
+        # configured) so builds can be compared
+        self.root.save_replay()
+        self.root.leaderboard_writer.close()    # commit the entries still queued
+        if not const.PROFILE_ENABLED or not profiler.frames:
+            return
+        for path in const.PROFILE_TRACE_FILES:
+            try:
+                profiler.dump(path)
+            except OSError as e:
+                ui_log.error("Failed to write profiler trace %s: %s", path, e)
+        ui_log.info("Profiler trace of %s frames written to %s", profiler.frames, ", ".join(const.PROFILE_TRACE_FILES))
+
 if __name__ == "__main__":
-    print(" Cannon Game...")
+    setup_logging()
+    ui_log.info("Cannon Game...")
     CannonApp().run()
 
 
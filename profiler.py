@@ -0,0 +1,149 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+import cannon_constants as const
+
+# Profiler Module: frame-time instrumentation. Code marks the phases it wants measured with named timing scopes
+# (`with profiler.scope("collisions"):`) and reports per-frame counters (`profiler.count("pairs", n)`); the game
+# loop closes each frame with end_frame(). The last const.PROFILE_WINDOW frames feed the rolling percentiles shown
+# by the in-game overlay, the last const.PROFILE_TRACE_FRAMES are kept as a trace that can be written to CSV or
+# JSON to compare builds. Times are in milliseconds. A disabled profiler hands out a shared no-op scope.
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, perf_counter() - self.start)
+        return False
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_scope = _NullScope()
+
+
+# Profiler Class: accumulates scope times and counters for the current frame and keeps the finished frames
+
+class Profiler:
+    def __init__(self, enabled=const.PROFILE_ENABLED, window=const.PROFILE_WINDOW,
+                 trace_frames=const.PROFILE_TRACE_FRAMES):
+        self.enabled = enabled
+        self.window = window
+        self.history = {}       # scope or counter name -> deque of its last `window` per-frame values
+        self.trace = deque(maxlen=trace_frames)   # one dict per finished frame, oldest first
+        self.frames = 0         # number of frames finished
+        self.current = {}       # values of the frame in progress
+        self.frame_start = None
+
+    def scope(self, name):
+        # context manager adding the time spent inside it to `name` for the current frame
+        if not self.enabled:
+            return _null_scope
+        return _Scope(self, name)
+
+    def add_time(self, name, seconds):
+        self.current[name] = self.current.get(name, 0.0) + seconds * 1000.0
+
+    def count(self, name, value=1):
+        if self.enabled:
+            self.current[name] = self.current.get(name, 0) + value
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = perf_counter()
+
+    def end_frame(self):
+        # close the frame: its total time goes to "frame", every value is pushed to the history and the trace
+        if not self.enabled:
+            return
+        if self.frame_start is not None:
+            self.current["frame"] = (perf_counter() - self.frame_start) * 1000.0
+            self.frame_start = None
+        for name, value in self.current.items():
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self.window)
+            self.history[name].append(value)
+        self.current["index"] = self.frames
+        self.trace.append(self.current)
+        self.current = {}
+        self.frames += 1
+
+    def percentiles(self, name, ranks=(50, 95, 99)):
+        # nearest-rank percentiles of `name` over the rolling window, or None before its first frame
+        values = sorted(self.history.get(name, ()))
+        if not values:
+            return None
+        return {rank: values[min(len(values) - 1, max(0, -(-rank * len(values) // 100) - 1))] for rank in ranks}
+
+    def histogram(self, name="frame", edges=const.PROFILE_BUCKETS_MS):
+        # how many frames of the rolling window fall below each edge (in ms), plus the ones above the last edge
+        counts = [0] * (len(edges) + 1)
+        for value in self.history.get(name, ()):
+            counts[next((i for i, edge in enumerate(edges) if value < edge), len(edges))] += 1
+        labels = [f"<{edge}" for edge in edges] + [f">={edges[-1]}"]
+        return dict(zip(labels, counts))
+
+    def summary(self):
+        # percentiles, mean and max of every scope and counter over the rolling window
+        result = {}
+        for name, values in self.history.items():
+            stats = {f"p{rank}": value for rank, value in self.percentiles(name).items()}
+            stats["mean"] = sum(values) / len(values)
+            stats["max"] = max(values)
+            result[name] = stats
+        return result
+
+    def overlay_text(self):
+        # a few lines for the on-screen overlay: timing scopes as p50/p95/p99 in ms, counters as p50/max
+        lines = []
+        for name, stats in sorted(self.summary().items(), key=lambda item: item[0] != "frame"):
+            if name in const.PROFILE_COUNTERS:
+                lines.append(f"{name}: {stats['p50']:.0f} / {stats['max']:.0f}")
+            else:
+                lines.append(f"{name}: {stats['p50']:.2f} / {stats['p95']:.2f} / {stats['p99']:.2f} ms")
+        return "\n".join(lines) or "no frames yet"
+
+    def dump(self, path):
+        # write the trace to `path`, as CSV (one row per frame) if it ends in .csv and as JSON otherwise
+        frames = list(self.trace)
+        if path.endswith(".csv"):
+            columns = ["index"] + sorted({name for frame in frames for name in frame} - {"index"})
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, restval="")
+                writer.writeheader()
+                writer.writerows(frames)
+        else:
+            with open(path, "w") as f:
+                json.dump({"frames": self.frames, "summary": self.summary(),
+                           "histogram": self.histogram(), "trace": frames}, f, indent=1)
+
+    def reset(self):
+        self.history.clear()
+        self.trace.clear()
+        self.current = {}
+        self.frames = 0
+        self.frame_start = None
+
+
+# the game's profiler; unless profiling is configured it keeps no trace, only the overlay's rolling window
+profiler = Profiler(trace_frames=const.PROFILE_TRACE_FRAMES if const.PROFILE_ENABLED else 0)
+idle_profiler = Profiler(enabled=False)   # default of worlds nobody measures, such as the trajectory preview copies
@@ -1,148 +1,116 @@
-import math
 from kivy.uix.widget import Widget
 from kivy.uix.image import Image
-import cannon_constants as const
-from kivy.clock import Clock
+from simulation import ProjectileBody, interpolate
+from assets import assets
+
+# Projectile Class: visual mirror of a ProjectileBody. The flight physics are simulated headless in the
+# simulation module; the widget keeps its image centered on the body's position. Widgets are recycled through a
+# ProjectilePool instead of being rebuilt (and their image reloaded) for every shot.
+
+# image and widget size used for each projectile type
+PROJECTILE_SPRITES = {
+    "bullet": ("images/small_images/bullet_widget.png", (40, 70)),
+    "bombshell": ("images/small_images/bombshell_widget.png", (30, 42)),
+    "laser": ("images/small_images/laser_widget.png", (100, 100)),
+}
 
-# Projectile Class: Handles the behavior of different projectile types
 
 class Projectile(Widget):
     def __init__(self, projectile_type, start_position, **kwargs):
         super().__init__(**kwargs)
-
-        # initialize projectile type and state variables
-        self.projectile_type = projectile_type
-        self.position = list(start_position) 
-        self.velocity = [0, 0]
-        self.active = True
-        self.just_teleported = False
-        self.teleport_cooldown = 0.0
-
-        # configure projectile parameters based on its type
-        if self.projectile_type == "bullet":
-            self.radius = const.BULLET_RADIUS
-            self.image_source = "images/small_images/bullet_widget.png"
-            self.size = (40, 70)
-        elif self.projectile_type == "bombshell":
-            # bombshell projectiles are heavier and penetrate obstacles
-            self.radius = const.BOMB_RADIUS
-            self.image_source = "images/small_images/bombshell_widget.png"
-            self.size = (30, 42)
-            self.bomb_mass = const.BOMB_MASS
-            self.bomb_drill_remaining = const.BOMB_DRILL    # penetration distance remaining
-        elif self.projectile_type == "laser":
-            # laser projectiles ignore gravity and use constant speed
-            self.size = (100, 100)
-            self.radius = self.size[0] // 2     # center-based radius
-            self.image_source = "images/small_images/laser_widget.png"
-            self.laser_timer = const.LASER_IMPULSE      # duration for which the laser remains active
-            self.laser_traveled_distance = 0
-            self.laser_start_position = list(self.position)
+        self.body = ProjectileBody(projectile_type, start_position)
+        self.image_source, self.size = PROJECTILE_SPRITES[projectile_type]
 
         # create the image widget to represent the projectile and center it
-        self.image_widget = Image(
-            source=self.image_source,
-            size=self.size,
-            pos=(self.position[0] - self.size[0] // 2,
-                 self.position[1] - self.size[1] // 2)
-        )
+        self.image_widget = Image(texture=assets.texture(self.image_source), size=self.size)
         self.add_widget(self.image_widget)
+        self.sync()
 
-    def launch(self, angle, power):
-        radian_angle = math.radians(angle)
-        if self.projectile_type == "laser":
-            # for lasers, ignore 'power' and use a fixed speed
-            self.velocity = [
-                const.LASER_VEL * math.cos(radian_angle),
-                const.LASER_VEL * math.sin(radian_angle)
-            ]
-        elif self.projectile_type == "bombshell":
-            # bombshells use a lower multiplier to simulate greater mass
-            self.velocity = [
-                power * math.cos(radian_angle) * 2,  
-                power * math.sin(radian_angle) * 2
-            ]
-        else:
-            # bullets use the standard multiplier
-            self.velocity = [
-                power * math.cos(radian_angle) * 5,
-                power * math.sin(radian_angle) * 5
-            ]
-        print(f"Projectile launched with velocity: {self.velocity}")
-
-    def update(self, dt):
-        # update the projectile's position and check for removal conditions
-        if not self.active:
-            return
+    # read-only views on the simulated state
+    @property
+    def projectile_type(self):
+        return self.body.projectile_type
 
-        # process teleport cooldown
-        if self.just_teleported:
-            self.teleport_cooldown -= dt
-            if self.teleport_cooldown <= 0:
-                self.just_teleported = False
+    @property
+    def position(self):
+        return self.body.position
 
-        # save current position for distance calculations
-        old_position = list(self.position)
+    @property
+    def velocity(self):
+        return self.body.velocity
 
-        # apply gravity to non-laser projectiles
-        if self.projectile_type != "laser":
-            gravity = 9.8
-            self.velocity[1] -= gravity * dt
-        else:
-            self.laser_timer -= dt
-
-        # update logical position based on velocity
-        self.position[0] += self.velocity[0] * dt
-        self.position[1] += self.velocity[1] * dt
-
-        # calculate distance traveled during this update
-        dx = self.position[0] - old_position[0]
-        dy = self.position[1] - old_position[1]
-        distance_moved = math.sqrt(dx * dx + dy * dy)
-
-        # for laser: update traveled distance and check if it should be removed
-        if self.projectile_type == "laser":
-            self.laser_traveled_distance += distance_moved
-            if self.laser_timer <= 0 or self.laser_traveled_distance >= const.LASER_DIST:
-                self.remove_projectile()
-                return
-        # for bombshell: decrement the penetration distance remaining
-        elif self.projectile_type == "bombshell":
-            self.bomb_drill_remaining -= distance_moved
-            if self.bomb_drill_remaining <= 0:
-                self.remove_projectile()
-                return
-
-        # remove projectile if it exits the extended game area
-        extended_margin = 1000
-        if (self.position[0] + self.radius < -extended_margin or 
-            self.position[0] - self.radius > const.SCREEN_WIDTH + extended_margin or
-            self.position[1] + self.radius < -extended_margin or 
-            self.position[1] - self.radius > const.SCREEN_HEIGHT + extended_margin):
-            self.remove_projectile()
-            return
+    @property
+    def radius(self):
+        return self.body.radius
 
-        # update the image widget's position to keep it centered on the logical position
-        if self.active and hasattr(self, 'image_widget'):
-            self.image_widget.pos = (
-                self.position[0] - self.size[0] // 2,
-                self.position[1] - self.size[1] // 2
-            )
+    def reset(self, start_position):
+        # reuse this widget for a new shot of the same type
+        self.body.reset(start_position)
+        self.sync()
+
+    def launch(self, angle, power):
+        self.body.launch(angle, power)
 
     def is_active(self):
-        # return whether the projectile is currently active
-        return self.active
+        return self.body.active
 
     def get_position(self):
-        # return the current logical position of the projectile
-        return self.position
+        return self.body.position
 
     def get_radius(self):
-        # return the effective collision radius of the projectile
-        return self.radius
+        return self.body.radius
+
+    def sync(self, alpha=1.0):
+        # keep the image widget centered on the simulated position, interpolated between the last two physics steps
+        x, y = interpolate(self.body, alpha)
+        self.image_widget.pos = (
+            x - self.size[0] // 2,
+            y - self.size[1] // 2
+        )
 
     def remove_projectile(self):
         # remove the projectile widget from its parent and mark it as inactive
         if self.parent:
             self.parent.remove_widget(self)
-        self.active = False
+        self.body.active = False
+
+
+# ProjectilePool Class: per-type free lists of projectile widgets. Released widgets keep their Image (and texture),
+# so a new shot only resets the body instead of constructing widgets and leaving the old ones to the GC.
+
+class ProjectilePool:
+    def __init__(self):
+        self.free = {projectile_type: [] for projectile_type in PROJECTILE_SPRITES}
+        self.in_use = {projectile_type: 0 for projectile_type in PROJECTILE_SPRITES}
+        self.high_water = {projectile_type: 0 for projectile_type in PROJECTILE_SPRITES}  # most in use at once
+        self.created = 0
+
+    def acquire(self, projectile_type, start_position):
+        # a ready projectile widget at start_position, recycled when one is free
+        free = self.free[projectile_type]
+        if free:
+            projectile = free.pop()
+            projectile.reset(start_position)
+        else:
+            projectile = Projectile(projectile_type, start_position)
+            self.created += 1
+        self.in_use[projectile_type] += 1
+        self.high_water[projectile_type] = max(self.high_water[projectile_type], self.in_use[projectile_type])
+        return projectile
+
+    def release(self, projectile):
+        # take back a widget that was detached from the screen; releasing twice is ignored
+        free = self.free[projectile.projectile_type]
+        if projectile in free:
+            return
+        projectile.body.active = False
+        free.append(projectile)
+        self.in_use[projectile.projectile_type] -= 1
+
+    def stats(self):
+        # diagnostics: pooled (free) widgets, widgets in flight and high-water marks per type
+        return {
+            projectile_type: {"free": len(self.free[projectile_type]), "in_use": self.in_use[projectile_type],
+                              "high_water": self.high_water[projectile_type]}
+            for projectile_type in PROJECTILE_SPRITES
+        } | {"created": self.created}
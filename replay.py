@@ -0,0 +1,242 @@
+import os
+import struct
+import sys
+import time
+
+import cannon_constants as const
+from levels import levels_digest
+from simulation import World, ProjectileBody, cannon_tip, level_rng
+
+# Replay Module: games recorded as their inputs instead of their frames. A replay holds the game seed, the field
+# size and the input events, each stamped with the physics step of the level at which it happened. Since level
+# layouts come from the seed and the world only ever advances in fixed steps, applying the same events at the
+# same steps re-simulates the game exactly, as long as the level file is the same: its digest is stored with the
+# replay and ReplayPlayer refuses a replay of other levels. ReplayPlayer re-simulates without a window, as fast as
+# the CPU allows (run) or paced to a frame clock (advance).
+#
+# File format (little endian): header "CNRP", version (u8), seed (u32), field width and height (u16 each), digest
+# of the level file (32 bytes, see levels.levels_digest), then one record per event: steps since the previous event
+# of the level (varint), event code (u8), argument (zigzag varint). A typical level takes a few hundred bytes.
+
+MAGIC = b"CNRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBIHH32s")
+MAX_SEED = 2 ** 32 - 1      # the seed is stored as a u32
+
+# event codes and what their argument holds
+LEVEL = 0           # a level starts (level number); the step clock restarts at 0
+ROTATE = 1          # the cannon was rotated (new angle)
+POWER = 2           # the velocity was changed (new velocity)
+SELECT = 3          # a projectile type was selected (index in PROJECTILE_TYPES)
+SHOOT = 4           # a shot was fired with the current angle, velocity and projectile
+RESET = 5           # the level was reset
+TRAJECTORY = 6      # the trajectory preview was bought
+END = 7             # the level ended, won or lost (score at that moment)
+EVENT_NAMES = ("level", "rotate", "power", "select", "shoot", "reset", "trajectory", "end")
+PROJECTILE_TYPES = ("bullet", "bombshell", "laser")
+
+
+def _write_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        if offset >= len(data) or shift > 63:
+            raise ValueError("truncated or corrupt replay")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+# Replay Class: the recorded game, appended to while playing and serialized when the game ends
+
+class Replay:
+    def __init__(self, seed, width=const.SCREEN_WIDTH, height=const.SCREEN_HEIGHT, events=None, levels=None):
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"replays need a game seed from 0 to {MAX_SEED}, not {seed}")
+        self.seed = seed
+        self.width = int(width)
+        self.height = int(height)
+        self.events = events if events is not None else []   # (step, code, arg) in recording order
+        self.levels = levels if levels is not None else levels_digest()   # the level file it was recorded with
+
+    def record(self, step, code, arg=0):
+        self.events.append((step, code, int(arg)))
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.width, self.height, self.levels))
+        last_step = 0
+        for step, code, arg in self.events:
+            if code == LEVEL:
+                last_step = 0
+            _write_varint(out, step - last_step)
+            out.append(code)
+            _write_varint(out, (arg << 1) ^ (arg >> 63))    # zigzag, so small negative angles stay short
+            last_step = step
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < 5 or data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError(f"not a version {VERSION} replay")
+        if len(data) < HEADER.size:
+            raise ValueError("truncated replay header")
+        _, _, seed, width, height, levels = HEADER.unpack_from(data)
+        events = []
+        offset = HEADER.size
+        step = 0
+        while offset < len(data):
+            delta, offset = _read_varint(data, offset)
+            if offset >= len(data) or data[offset] >= len(EVENT_NAMES):
+                raise ValueError("truncated or corrupt replay")
+            code = data[offset]
+            zigzag, offset = _read_varint(data, offset + 1)
+            if code == LEVEL:
+                step = 0
+            step += delta
+            events.append((step, code, (zigzag >> 1) ^ -(zigzag & 1)))
+        return cls(seed, width, height, events, levels)
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+# ReplayPlayer Class: re-simulates a replay headless with the same rules CanGame applies to each input.
+# `results` gets one entry per finished level, with the re-simulated score next to the recorded one.
+
+class ReplayPlayer:
+    def __init__(self, replay, step_dt=1.0 / const.PHYSICS_RATE):
+        if replay.levels != levels_digest():
+            raise ValueError("the replay was recorded with another level file")
+        self.replay = replay
+        self.step_dt = step_dt
+        self.next_event = 0
+        self.world = None           # the world of the level being played, None between levels
+        self.level = 0
+        self.level_snapshot = []
+        self.score = 0
+        self.level_base_score = 0
+        self.shots_left = 10
+        self.angle = 45
+        self.velocity = 50
+        self.selected_projectile = "bullet"
+        self.accumulator = 0.0
+        self.results = []
+
+    @property
+    def done(self):
+        return self.next_event >= len(self.replay.events)
+
+    def step(self):
+        # apply the events due before the next physics step, then take it
+        events = self.replay.events
+        while not self.done:
+            step, code, arg = events[self.next_event]
+            if code != LEVEL and self.world is not None and step > self.world.steps:
+                break
+            self.next_event += 1
+            self.apply(code, arg)
+        if self.world is not None and not self.done:
+            self.score += self.world.step(self.step_dt)
+
+    def run(self):
+        # fast-forward: re-simulate the whole replay and return the per-level results
+        while not self.done:
+            self.step()
+        return self.results
+
+    def advance(self, frame_dt):
+        # real-time playback for a viewer: take as many steps as frame_dt covers
+        self.accumulator += frame_dt
+        while self.accumulator >= self.step_dt and not self.done:
+            self.step()
+            self.accumulator -= self.step_dt
+
+    def apply(self, code, arg):
+        if code == LEVEL:
+            # same setup as CanGame.init_game and initialize_obstacles
+            self.level = arg
+            self.world = World(self.replay.width, self.replay.height)
+            self.world.populate(arg, level_rng(self.replay.seed, arg))
+            self.level_snapshot = self.world.snapshot()
+            self.level_base_score = self.score
+            self.shots_left = 10
+            self.angle = 45
+        elif code == ROTATE:
+            self.angle = arg
+        elif code == POWER:
+            self.velocity = arg
+        elif code == SELECT:
+            self.selected_projectile = PROJECTILE_TYPES[arg]
+        elif code == SHOOT:
+            body = ProjectileBody(self.selected_projectile, cannon_tip(const.CANNON_POSITION, self.angle))
+            body.launch(self.angle, self.velocity)
+            self.world.add_projectile(body)
+            self.shots_left -= 1
+        elif code == RESET:
+            self.world.restore(self.level_snapshot)
+            self.shots_left = 10
+            self.score = self.level_base_score - 15
+            self.level_base_score = self.score
+        elif code == TRAJECTORY:
+            self.score -= 10
+        elif code == END:
+            self.results.append({
+                "level": self.level,
+                "steps": self.world.steps,
+                "score": self.score,
+                "recorded_score": arg,
+                "matches": self.score == arg,
+                "targets_left": sum(o.obstacle_type == "target" for o in self.world.obstacles),
+                "shots_left": self.shots_left,
+            })
+            self.world = None
+
+
+def replay_path(seed, directory=const.REPLAY_DIR):
+    # file name of a newly recorded game: its seed and when it ended
+    return os.path.join(directory, f"{seed}_{time.strftime('%Y%m%d-%H%M%S')}.cnr")
+
+
+if __name__ == "__main__":
+    # fast-forward every replay given on the command line and report whether it reproduces the recorded scores
+    if len(sys.argv) < 2:
+        sys.exit("usage: python replay.py REPLAY [REPLAY ...]")
+    failures = 0
+    for path in sys.argv[1:]:
+        try:
+            replay = Replay.load(path)
+            player = ReplayPlayer(replay)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}")
+            failures += 1
+            continue
+        start = time.perf_counter()
+        results = player.run()
+        elapsed = time.perf_counter() - start
+        simulated = sum(result["steps"] for result in results) * player.step_dt
+        print(f"{path}: seed {replay.seed}, {len(replay.events)} events, {os.path.getsize(path)} bytes, "
+              f"{simulated:.1f} s simulated in {elapsed:.3f} s")
+        for result in results:
+            status = "ok" if result["matches"] else "MISMATCH"
+            print(f"  level {result['level']}: score {result['score']} (recorded {result['recorded_score']}), "
+                  f"{result['targets_left']} targets left, {result['shots_left']} shots left, {status}")
+            failures += not result["matches"]
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,520 @@
+import copy
+import math
+import random
+
+import cannon_constants as const
+from diagnostics import get_logger
+from levels import get_level
+from profiler import idle_profiler
+
+log = get_logger("sim")
+
+
+# Simulation Module: headless game state and physics. Nothing in here imports Kivy, so whole games can be
+# stepped without a window; the widgets in obstacle.py and projectile.py only draw these bodies.
+
+
+# ObstacleBody Class: plain state of an obstacle (rock, mirror, wormhole, perpetio) with its movement and hit logic
+
+class ObstacleBody:
+    def __init__(self, obstacle_type, position, velocity=(0, 0), movable=True, radius=30, hit_radius=None):
+        self.obstacle_type = obstacle_type
+        self.position = list(position)
+        self.prev_position = self.position[:]   # position at the start of the last step, for interpolation
+        self.movable = movable
+        self.vx, self.vy = velocity if movable else (0, 0)
+        self.radius = radius                                                # radius used for wall bouncing
+        self.hit_radius = radius if hit_radius is None else hit_radius      # radius used for projectile hits
+        self.active = True
+
+        # rocks and targets are destructible; the other obstacle types are not
+        if obstacle_type in ["target", "rock"]:
+            self.health = 3
+        else:
+            self.health = None
+
+    def update(self, dt, width, height):
+        # move by the current velocity and bounce off the field edges
+        self.prev_position[:] = self.position
+        if not self.movable:
+            return
+        self.position[0] += self.vx * dt
+        self.position[1] += self.vy * dt
+        if self.position[0] - self.radius <= 0 or self.position[0] + self.radius >= width:
+            self.vx = -self.vx
+        if self.position[1] - self.radius <= 0 or self.position[1] + self.radius >= height:
+            self.vy = -self.vy
+
+    def collision(self, projectile):
+        # a projectile hits when the two circles touch at any time during the last step
+        return self.time_of_impact(projectile) is not None
+
+    def time_of_impact(self, projectile):
+        # swept-circle test: both bodies move linearly from prev_position to position during the step. Returns the
+        # fraction of the step (0..1) at which the circles first overlap, or None if they never do.
+        reach = self.hit_radius + projectile.get_radius()
+        start_x = projectile.prev_position[0] - self.prev_position[0]
+        start_y = projectile.prev_position[1] - self.prev_position[1]
+        c = start_x * start_x + start_y * start_y - reach * reach
+        if c < 0:
+            return 0.0      # already overlapping at the start of the step
+        end_x, end_y = projectile.get_position()
+        move_x = end_x - self.position[0] - start_x
+        move_y = end_y - self.position[1] - start_y
+        a = move_x * move_x + move_y * move_y
+        b = start_x * move_x + start_y * move_y
+        if a == 0 or b >= 0:
+            return None     # no relative motion, or moving apart
+        discriminant = b * b - a * c
+        if discriminant < 0:
+            return None
+        t = (-b - math.sqrt(discriminant)) / a
+        return t if t <= 1 else None
+
+    def on_hit(self, projectile):
+        # rocks and targets lose one health per hit; return True once they are destroyed
+        if self.health is None:
+            return False
+        self.health -= 1
+        return self.health <= 0
+
+
+def cannon_tip(position, angle, barrel_length=const.CANNON_BARREL):
+    # point where projectiles leave a cannon at `position` rotated to angle (degrees)
+    radian_angle = math.radians(angle)
+    return [position[0] + math.cos(radian_angle) * (barrel_length + 10),
+            position[1] + math.sin(radian_angle) * (barrel_length + 10)]
+
+
+def launch_velocity(projectile_type, angle, power):
+    # initial velocity of a projectile fired at angle (degrees) with the chosen power
+    radian_angle = math.radians(angle)
+    if projectile_type == "laser":
+        # lasers ignore 'power' and use a fixed speed
+        speed = const.LASER_VEL
+    elif projectile_type == "bombshell":
+        # bombshells use a lower multiplier to simulate greater mass
+        speed = power * 2
+    else:
+        speed = power * 5
+    return [speed * math.cos(radian_angle), speed * math.sin(radian_angle)]
+
+
+# ProjectileBody Class: plain state of a bullet, bombshell or laser in flight
+
+class ProjectileBody:
+    def __init__(self, projectile_type, start_position):
+        self.projectile_type = projectile_type
+        self.reset(start_position)
+
+    def reset(self, start_position):
+        # put the projectile back in its just-created state at start_position, so pooled bodies can be reused
+        self.position = list(start_position)
+        self.prev_position = self.position[:]   # position at the start of the last step, for interpolation
+        self.velocity = [0, 0]
+        self.active = True
+        self.just_teleported = False
+        self.teleport_cooldown = 0.0
+
+        # configure the physical parameters of each projectile type
+        if self.projectile_type == "bullet":
+            self.radius = const.BULLET_RADIUS
+        elif self.projectile_type == "bombshell":
+            # bombshells are heavier and penetrate obstacles
+            self.radius = const.BOMB_RADIUS
+            self.bomb_mass = const.BOMB_MASS
+            self.bomb_drill_remaining = const.BOMB_DRILL    # penetration distance remaining
+        elif self.projectile_type == "laser":
+            # lasers ignore gravity and travel at constant speed for a limited time
+            self.radius = const.LASER_RADIUS
+            self.laser_timer = const.LASER_IMPULSE
+            self.laser_traveled_distance = 0
+            self.laser_start_position = list(self.position)
+
+    def launch(self, angle, power):
+        # set the initial velocity from the cannon angle (degrees) and the chosen power
+        self.velocity = launch_velocity(self.projectile_type, angle, power)
+        log.debug("Projectile launched with velocity: %s", self.velocity)
+
+    def update(self, dt):
+        # integrate one step and deactivate the projectile when it runs out of range
+        if not self.active:
+            return
+        self.prev_position[:] = self.position
+
+        # process teleport cooldown
+        if self.just_teleported:
+            self.teleport_cooldown -= dt
+            if self.teleport_cooldown <= 0:
+                self.just_teleported = False
+
+        # apply gravity to non-laser projectiles
+        if self.projectile_type != "laser":
+            self.velocity[1] -= const.GRAVITY * dt
+        else:
+            self.laser_timer -= dt
+
+        dx = self.velocity[0] * dt
+        dy = self.velocity[1] * dt
+        self.position[0] += dx
+        self.position[1] += dy
+        distance_moved = math.sqrt(dx * dx + dy * dy)
+
+        if self.projectile_type == "laser":
+            self.laser_traveled_distance += distance_moved
+            if self.laser_timer <= 0 or self.laser_traveled_distance >= const.LASER_DIST:
+                self.active = False
+                return
+        elif self.projectile_type == "bombshell":
+            self.bomb_drill_remaining -= distance_moved
+            if self.bomb_drill_remaining <= 0:
+                self.active = False
+                return
+
+        # deactivate the projectile once it leaves the extended game area
+        extended_margin = 1000
+        if (self.position[0] + self.radius < -extended_margin or
+                self.position[0] - self.radius > const.SCREEN_WIDTH + extended_margin or
+                self.position[1] + self.radius < -extended_margin or
+                self.position[1] - self.radius > const.SCREEN_HEIGHT + extended_margin):
+            self.active = False
+
+    def is_active(self):
+        return self.active
+
+    def get_position(self):
+        return self.position
+
+    def get_radius(self):
+        return self.radius
+
+
+def interpolate(body, alpha):
+    # position between the previous and the current step; alpha is the fraction of a step elapsed since then
+    prev = body.prev_position
+    return (prev[0] + (body.position[0] - prev[0]) * alpha,
+            prev[1] + (body.position[1] - prev[1]) * alpha)
+
+
+# seeds: every game draws a seed, and each level generates its layout from its own generator derived from it, so
+# a game (or a single level) is reproduced exactly by replaying the seed
+
+def new_game_seed():
+    # const.GAME_SEED when set, so a reported game can be replayed, otherwise a fresh random seed
+    if const.GAME_SEED is not None:
+        return const.GAME_SEED
+    return random.SystemRandom().randrange(const.SEED_RANGE)
+
+
+def level_rng(game_seed, level):
+    # the generator of one level of a game; string seeds are hashed with SHA-512, stable across runs and platforms
+    return random.Random(f"{game_seed}/level-{level}")
+
+
+# factory helpers holding the spawn velocity rules; positions come from the level layouts (levels.py) and `rng` is
+# the level's generator (the global random module when the caller does not need reproducible layouts)
+
+def make_obstacle(obstacle_type, position, velocity=None, rng=random, speed=5):
+    # obstacles move with a random velocity of up to `speed` on each axis unless given one; (0, 0) keeps them still
+    if velocity is None:
+        velocity = (rng.uniform(-speed, speed), rng.uniform(-speed, speed))
+    log.debug("Obstacle initialized with velocity: vx=%s, vy=%s", velocity[0], velocity[1])
+    return ObstacleBody(obstacle_type, position, velocity, movable=any(velocity), radius=30)
+
+
+def make_target(position, velocity=None, rng=random, speed=5, min_speed=1):
+    # targets get a minimum speed on both axes so their movement is noticeable
+    if velocity is None:
+        vx = rng.uniform(-speed, speed)
+        if abs(vx) < min_speed:
+            vx = min_speed
+        vy = rng.uniform(-speed, speed)
+        if abs(vy) < min_speed:
+            vy = min_speed
+        velocity = (vx, vy)
+    return ObstacleBody("target", position, velocity, movable=any(velocity), radius=30, hit_radius=40)
+
+
+def swept_bounds(body, radius):
+    # center and radius of a circle enclosing the body over its whole last step
+    (x0, y0), (x1, y1) = body.prev_position, body.position
+    half_x, half_y = (x1 - x0) / 2, (y1 - y0) / 2
+    return x0 + half_x, y0 + half_y, radius + math.sqrt(half_x * half_x + half_y * half_y)
+
+
+# SpatialHash Class: uniform-grid broad phase. Circles are bucketed by the cells their bounding box covers, so a
+# query only returns the bodies sharing a cell with the queried circle instead of every body in the world.
+
+class SpatialHash:
+    def __init__(self, cell_size=const.COLLISION_CELL):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def _cell_range(self, x, y, radius):
+        size = self.cell_size
+        return (int((x - radius) // size), int((x + radius) // size),
+                int((y - radius) // size), int((y + radius) // size))
+
+    def insert(self, item, x, y, radius):
+        x0, x1, y0, y1 = self._cell_range(x, y, radius)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def query(self, x, y, radius):
+        # every item whose cells overlap the circle's bounding box, each reported once
+        found = {}
+        x0, x1, y0, y1 = self._cell_range(x, y, radius)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for item in self.cells.get((cx, cy), ()):
+                    found[id(item)] = item
+        return found.values()
+
+
+# World Class: owns every body of a level and advances the whole simulation with step(dt)
+
+class World:
+    def __init__(self, width=const.SCREEN_WIDTH, height=const.SCREEN_HEIGHT, profiler=idle_profiler):
+        self.width = width
+        self.height = height
+        self.obstacles = []      # obstacles and targets
+        self.projectiles = []
+        self.grid = SpatialHash()
+        self.profiler = profiler  # receives the timing scopes and counters of every step
+        self.pairs_tested = 0    # narrow-phase tests run during the last step
+        self.hits = 0            # contacts resolved during the last step
+        self.time = 0.0          # simulated seconds since the world was created
+        self.steps = 0           # number of steps taken, the clock replays are timed against
+        self.layout_version = 0  # bumped whenever an obstacle is added or removed
+        self.state_anchor = None  # (layout version, key, obstacle state) of the last state_key()
+
+    def add_obstacle(self, body):
+        self.obstacles.append(body)
+        self.layout_version += 1
+        return body
+
+    def add_projectile(self, body):
+        self.projectiles.append(body)
+        return body
+
+    def remove_projectile(self, body):
+        body.active = False
+        if body in self.projectiles:
+            self.projectiles.remove(body)
+
+    def copy(self):
+        # independent copy of the obstacles (not the projectiles), for what-if runs such as the trajectory preview
+        clone = World(self.width, self.height)
+        clone.obstacles = copy.deepcopy(self.obstacles)
+        clone.time = self.time
+        clone.steps = self.steps
+        return clone
+
+    def state_key(self, quantum=const.TRAJ_STATE_QUANTUM):
+        # hashable summary of the obstacles, positions rounded to `quantum` pixels: worlds with the same key send a
+        # shot the same way, give or take the rounding. The key is kept until an obstacle has moved `quantum`
+        # pixels from where it was when the key was taken, or has turned or been hit, so obstacles drifting across
+        # rounding boundaries one after the other do not change it every few frames.
+        anchor = self.state_anchor
+        if (anchor is None or anchor[0] != self.layout_version
+                or any(abs(body.position[0] - x) > quantum or abs(body.position[1] - y) > quantum
+                       or (round(body.vx), round(body.vy), body.health) != rest
+                       for body, (x, y, rest) in zip(self.obstacles, anchor[2]))):
+            state = [(body.position[0], body.position[1], (round(body.vx), round(body.vy), body.health))
+                     for body in self.obstacles]
+            key = hash(tuple((body.obstacle_type, round(x / quantum), round(y / quantum), rest)
+                             for body, (x, y, rest) in zip(self.obstacles, state)))
+            self.state_anchor = anchor = (self.layout_version, key, state)
+        return anchor[1]
+
+    def snapshot(self):
+        # compact record of every obstacle's restorable state: (body, x, y, vx, vy, health)
+        return [(body, body.position[0], body.position[1], body.vx, body.vy, body.health) for body in self.obstacles]
+
+    def restore(self, snapshot):
+        # put the obstacles back as recorded by snapshot(), reusing the same body objects
+        self.obstacles = []
+        for body, x, y, vx, vy, health in snapshot:
+            body.position[:] = (x, y)
+            body.prev_position[:] = (x, y)
+            body.vx, body.vy = vx, vy
+            body.health = health
+            body.active = True
+            self.obstacles.append(body)
+        self.layout_version += 1
+
+    def targets_left(self):
+        return any(o.obstacle_type == "target" for o in self.obstacles)
+
+    def populate(self, level, rng=random):
+        # set up a level from its precompiled definition (see levels.py), drawing every random number from rng
+        definition = get_level(level)
+        self.obstacles = []
+        self.projectiles = []
+        self.layout_version += 1
+        for obstacle_type, position, velocity in definition.layout(rng):
+            if obstacle_type == "target":
+                body = make_target(position, velocity, rng, definition.target_speed, definition.target_min_speed)
+            else:
+                body = make_obstacle(obstacle_type, position, velocity, rng, definition.obstacle_speed)
+            self.add_obstacle(body)
+        return definition.counts()
+
+    def step(self, dt):
+        # advance every body by dt, resolve collisions and return the points scored during the step
+        profiler = self.profiler
+        self.time += dt
+        self.steps += 1
+        with profiler.scope("obstacles"):
+            for obstacle in self.obstacles:
+                obstacle.update(dt, self.width, self.height)
+        with profiler.scope("projectiles"):
+            for projectile in self.projectiles:
+                projectile.update(dt)
+            self.projectiles = [p for p in self.projectiles if p.active]
+        with profiler.scope("collisions"):
+            points = self.handle_collisions()
+        self.projectiles = [p for p in self.projectiles if p.active]
+        profiler.count("pairs", self.pairs_tested)
+        profiler.count("hits", self.hits)
+        return points
+
+    def remove_obstacle(self, obstacle):
+        obstacle.active = False
+        if obstacle in self.obstacles:
+            self.obstacles.remove(obstacle)
+            self.layout_version += 1
+
+    def handle_collisions(self):
+        # process collisions between projectiles and obstacles; the grid keeps only pairs whose swept paths are
+        # near each other, and the swept test finds when during the step each pair touches
+        self.pairs_tested = 0
+        self.hits = 0
+        if not self.projectiles or not self.obstacles:
+            return 0
+        order = {id(obstacle): index for index, obstacle in enumerate(self.obstacles)}
+        if len(self.projectiles) < const.BROAD_PHASE_MIN_PROJECTILES:
+            # building the grid costs a pass over every obstacle, which only pays off once enough projectiles
+            # query it
+            candidates = [(projectile, self.obstacles) for projectile in self.projectiles]
+        else:
+            self.grid.clear()
+            for obstacle in self.obstacles:
+                self.grid.insert(obstacle, *swept_bounds(obstacle, obstacle.hit_radius))
+            candidates = [(projectile, self.grid.query(*swept_bounds(projectile, projectile.radius)))
+                          for projectile in self.projectiles]
+
+        hits = []
+        for p_index, (projectile, nearby) in enumerate(candidates):
+            for obstacle in nearby:
+                self.pairs_tested += 1
+                t = obstacle.time_of_impact(projectile)
+                if t is not None:
+                    hits.append((t, order[id(obstacle)], p_index, obstacle, projectile))
+
+        # resolve the hits earliest first, so a projectile meets the first body on its path. The hits were found on
+        # the path before the step: once a wormhole or a mirror sends a projectile elsewhere, its later hits are
+        # dropped, and the next step sweeps its new path.
+        hits.sort(key=lambda hit: hit[:3])
+        points = 0
+        redirected = set()
+        for _, _, _, obstacle, projectile in hits:
+            if obstacle.active and projectile.active and id(projectile) not in redirected:
+                self.hits += 1
+                position, velocity = projectile.position[:], projectile.velocity[:]
+                points += self.resolve_hit(obstacle, projectile)
+                if projectile.position != position or projectile.velocity != velocity:
+                    redirected.add(id(projectile))
+        return points
+
+    def resolve_hit(self, obstacle, projectile):
+        # apply the effect of one projectile/obstacle contact and return the points it scores
+        points = 0
+        # wormhole logic: teleport the projectile next to the paired wormhole
+        if obstacle.obstacle_type == "wormhole":
+            if projectile.just_teleported:
+                return 0
+            paired_wormhole = next(
+                (o for o in self.obstacles if o.obstacle_type == "wormhole" and o is not obstacle), None
+            )
+            if paired_wormhole:
+                offset = paired_wormhole.radius + 10
+                projectile.position = [
+                    paired_wormhole.position[0] + offset,
+                    paired_wormhole.position[1] + offset
+                ]
+                projectile.prev_position = projectile.position[:]   # do not interpolate across the jump
+                projectile.just_teleported = True
+                projectile.teleport_cooldown = 0.5
+                log.debug("Teleported to %s with velocity %s", projectile.position, projectile.velocity)
+
+        # mirror logic: lasers are reflected, bullets and bombshells disappear
+        elif obstacle.obstacle_type == "mirror":
+            if projectile.projectile_type == "laser":
+                projectile.velocity[0] = -projectile.velocity[0]
+                projectile.velocity[1] = -projectile.velocity[1]
+            else:
+                projectile.active = False
+
+        # perpetio logic: destroy the projectile
+        elif obstacle.obstacle_type == "perpetio":
+            projectile.active = False
+
+        # on-hit logic for rocks and targets
+        elif obstacle.on_hit(projectile):
+            if projectile.projectile_type == "bombshell":
+                # bombshell penetration: remove obstacles within BOMB_RADIUS of the impact point
+                impact_point = projectile.position
+                for obs in self.obstacles[:]:
+                    dist = math.sqrt((obs.position[0] - impact_point[0]) ** 2 +
+                                     (obs.position[1] - impact_point[1]) ** 2)
+                    if dist <= const.BOMB_RADIUS:
+                        if obs.obstacle_type == "target":
+                            points += 10
+                        self.remove_obstacle(obs)
+            else:
+                if obstacle.obstacle_type == "target":
+                    points += 10
+                self.remove_obstacle(obstacle)
+                projectile.active = False
+        return points
+
+
+# FixedTimestep Class: runs the world at a constant physics rate whatever the render rate, so outcomes do not
+# depend on frame timing. Leftover frame time is kept in an accumulator and exposed as `alpha` for interpolation.
+
+class FixedTimestep:
+    def __init__(self, rate=const.PHYSICS_RATE, max_substeps=const.MAX_SUBSTEPS):
+        self.step_dt = 1.0 / rate
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.steps = 0          # total number of physics steps taken
+        self.dropped_time = 0.0  # frame time discarded by the substep cap
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+    def advance(self, world, frame_dt):
+        # consume frame_dt in fixed steps and return the points scored
+        self.accumulator += frame_dt
+        points = 0
+        substeps = 0
+        while self.accumulator >= self.step_dt:
+            if substeps >= self.max_substeps:
+                # avoid the spiral of death: drop the backlog instead of trying to catch up
+                self.dropped_time += self.accumulator - self.step_dt
+                self.accumulator = self.step_dt * 0.999
+                break
+            points += world.step(self.step_dt)
+            self.accumulator -= self.step_dt
+            substeps += 1
+        self.steps += substeps
+        world.profiler.count("substeps", substeps)
+        self.alpha = self.accumulator / self.step_dt
+        return points
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The tests import the game's modules from the project root and run from there, since the level file and its cache
+# are found relative to the working directory, as in the game.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import cannon_constants as const
+from batch_simulation import ArrayWorld
+from simulation import World, ProjectileBody, cannon_tip, launch_velocity, level_rng
+
+# ArrayWorld must stay in step with simulation.World: the same seeded level, under the same shots, has to give the
+# same positions, hits and points at every step.
+
+STEP_DT = 1.0 / const.PHYSICS_RATE
+STEPS = 1500
+SHOT_EVERY = 30
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_array_world_matches_world(level, seed):
+    world = World()
+    world.populate(level, level_rng(seed, level))
+    batch = ArrayWorld.from_world(world)
+    shots = random.Random(seed)
+    total_hits = 0
+    for step in range(STEPS):
+        if step % SHOT_EVERY == 0:
+            projectile_type = shots.choice(("bullet", "bombshell", "laser"))
+            angle, power = shots.randint(5, 85), shots.randint(3, 10) * 10
+            start = cannon_tip(const.CANNON_POSITION, angle)
+            world.add_projectile(ProjectileBody(projectile_type, start)).launch(angle, power)
+            batch.add_projectile(projectile_type, start, launch_velocity(projectile_type, angle, power))
+
+        assert batch.step(STEP_DT) == world.step(STEP_DT), f"points differ at step {step}"
+        assert batch.hits == world.hits, f"hits differ at step {step}"
+        total_hits += world.hits
+
+        alive = batch.obstacles.active[:batch.obstacles.count]
+        obstacles = np.array([body.position for body in world.obstacles]).reshape(-1, 2)
+        projectiles = np.array([body.position for body in world.projectiles]).reshape(-1, 2)
+        assert batch.obstacles.position[:batch.obstacles.count][alive] == pytest.approx(obstacles, abs=1e-6), \
+            f"obstacles differ at step {step}"
+        assert batch.projectiles.position[:batch.projectiles.count] == pytest.approx(projectiles, abs=1e-6), \
+            f"projectiles differ at step {step}"
+    assert total_hits, "the shots never hit anything, the comparison proved nothing"
@@ -0,0 +1,105 @@
+import pytest
+
+from hall_of_fame import Leaderboard, LeaderboardWriter, format_entry
+
+# The leaderboard store: keyset paging, the duplicate check and the one-time import of the old text file.
+
+
+@pytest.fixture
+def board(tmp_path):
+    board = Leaderboard(str(tmp_path / "scores.db"))
+    yield board
+    board.close()
+
+
+def fill(board):
+    # 30 entries of three players with many tied scores, so pages end in the middle of a tie
+    entries = [(f"player{i % 3}", (i * 7) % 5 * 10, i % 4 + 1, i, False) for i in range(30)]
+    assert all(board.add_many(entries))
+    return entries
+
+
+def pages(board, limit, nickname=None):
+    rows, page = [], board.top(limit, nickname=nickname)
+    while page:
+        rows += page
+        page = board.top(limit, after=page[-1], nickname=nickname)
+    return rows
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7, 30, 50])
+def test_pages_cover_the_board_once_in_order(board, limit):
+    fill(board)
+    rows = pages(board, limit)
+    assert rows == board.top(100)
+    assert len(rows) == len({row_id for _, row_id, _ in rows}) == 30
+    assert [(-score, row_id) for score, row_id, _ in rows] == sorted((-score, row_id) for score, row_id, _ in rows)
+
+
+def test_pages_of_one_player(board):
+    entries = fill(board)
+    rows = pages(board, 3, nickname="player1")
+    assert len(rows) == board.count("player1") == sum(1 for e in entries if e[0] == "player1")
+    assert all(entry.startswith("Nickname: player1,") for _, _, entry in rows)
+    assert [score for score, _, _ in rows] == sorted((score for score, _, _ in rows), reverse=True)
+
+
+def test_duplicates_are_skipped(board):
+    assert board.add("ada", 120, 3, seed=7)
+    assert not board.add("ada", 120, 3, seed=7)
+    assert board.add_many([("ada", 120, 3, 7, False), ("ada", 120, None, 7, True), ("bob", 90, 2, None, False),
+                           ("bob", 90, 2, None, False)]) == [False, True, True, False]
+    assert board.count() == 3
+    assert [entry for _, _, entry in board.top()] == [format_entry("ada", 120, 3, 7),
+                                                      format_entry("ada", 120, None, 7, winner=True),
+                                                      format_entry("bob", 90, 2)]
+
+
+def test_text_file_is_imported_once(board, tmp_path):
+    text = tmp_path / "hall_of_fame.txt"
+    text.write_text("\n".join([format_entry("ada", 50, 2), "not an entry", format_entry("bob", 80, winner=True),
+                               format_entry("ada", 50, 2)]) + "\n")
+    assert board.import_text(str(text)) == 2
+    assert board.import_text(str(text)) == 0
+    assert board.import_text(str(tmp_path / "missing.txt")) == 0
+    assert [score for score, _, _ in board.top()] == [80, 50]
+
+
+def test_writer_commits_and_counts(tmp_path):
+    path = str(tmp_path / "scores.db")
+    writer = LeaderboardWriter(path, batch_window=0.01)
+    for i in range(20):
+        writer.add("ada", i, 1)
+    writer.add("ada", 0, 1)
+    assert writer.flush()
+    writer.close()
+    writer.add("ada", 99, 1)
+    assert (writer.written, writer.failed) == (20, 1)
+    board = Leaderboard(path)
+    assert board.count() == 20
+    board.close()
+
+
+def test_read_only_board_reads_empty_until_the_writer_creates_it(tmp_path):
+    path = str(tmp_path / "scores.db")
+    reader = Leaderboard(path, read_only=True)
+    assert reader.top() == [] and reader.count() == 0
+    writer = LeaderboardWriter(path, batch_window=0.01)
+    writer.add("ada", 10, 1)
+    assert writer.flush()
+    assert [entry for _, _, entry in reader.top()] == [format_entry("ada", 10, 1)]
+    writer.close()
+    reader.close()
+
+
+def test_read_only_board_does_not_wait_for_a_held_lock(tmp_path):
+    path = str(tmp_path / "scores.db")
+    holder = Leaderboard(path, journal_mode="DELETE")
+    holder.add("ada", 10, 1)
+    holder.db.execute("BEGIN EXCLUSIVE")
+    reader = Leaderboard(path, read_only=True)
+    assert reader.top() == []
+    holder.db.execute("ROLLBACK")
+    assert reader.count() == 1
+    holder.close()
+    reader.close()
@@ -0,0 +1,113 @@
+import copy
+import json
+import random
+
+import pytest
+
+import cannon_constants as const
+import levels
+
+# The level file: validation of what the file may say, the stored layouts and the binary cache they are kept in.
+
+with open(const.LEVELS_FILE) as f:
+    LEVEL_FILE = json.load(f)
+
+
+def edited(edit):
+    data = copy.deepcopy(LEVEL_FILE)
+    edit(data)
+    return data
+
+
+def test_the_shipped_file_is_valid():
+    specs = levels.validate(LEVEL_FILE)
+    assert len(specs) == len(LEVEL_FILE["levels"])
+    assert all(spec["counts"]["target"] >= 1 for spec in specs)
+
+
+@pytest.mark.parametrize("edit, message", [
+    (lambda data: data.update(levels=[]), 'non-empty "levels"'),
+    (lambda data: data["levels"][0].update(colour="dark"), "unknown keys"),
+    (lambda data: data["defaults"].update(colour="dark"), "defaults: unknown keys"),
+    (lambda data: data["levels"][0].update(background="images" + "/../images" * 30 + "/1_level.jpg"), "255 bytes"),
+    (lambda data: data["levels"][0].update(background="images/missing.jpg"), "not found"),
+    (lambda data: data["levels"][0].update(text_color="grey"), "text_color"),
+    (lambda data: data["levels"][0]["counts"].update(target=0), "at least one target"),
+    (lambda data: data["levels"][2]["counts"].update(wormhole=3), "odd"),
+    (lambda data: data["levels"][0]["counts"].update(dragon=1), "counts must map"),
+    (lambda data: data["levels"][0]["counts"].update(rock=-1), "whole numbers"),
+    (lambda data: data["levels"][0].update(variants=0), "variants"),
+    (lambda data: data["levels"][0].update(obstacles={"region": [0, 0, const.SCREEN_WIDTH + 1, 100]}),
+     "not inside"),
+    (lambda data: data["levels"][0].update(targets={"min_speed": 9}), "min_speed"),
+    (lambda data: data["levels"][0].update(layout=[{"type": "target", "position": [500, 400]}]),
+     "either counts or a layout"),
+])
+def test_invalid_files_are_rejected(edit, message):
+    with pytest.raises(ValueError, match=message):
+        levels.validate(edited(edit))
+
+
+def test_impossible_placement_is_rejected():
+    data = edited(lambda data: data["levels"][1].update(targets={"min_separation": 2000}))
+    with pytest.raises(ValueError, match="level 2: no room"):
+        levels.compile_levels(data)
+
+
+def test_fixed_layout():
+    def edit(data):
+        level = data["levels"][0]
+        del level["counts"]
+        level["layout"] = [{"type": "rock", "position": [600, 200], "velocity": [0, 0]},
+                           {"type": "target", "position": [700, 500]},
+                           {"type": "target", "position": [800, 300], "velocity": [2, -1]}]
+    level = levels.compile_levels(edited(edit))[0]
+    assert level.variants == 1
+    assert level.layout(random.Random(0)) == [("target", [700, 500], None), ("target", [800, 300], (2, -1)),
+                                              ("rock", [600, 200], (0, 0))]
+
+
+def test_layouts_keep_targets_apart_and_away_from_the_cannon():
+    for spec, level in zip(levels.validate(LEVEL_FILE), levels.compile_levels(LEVEL_FILE)):
+        rules = spec["targets"]
+        for variant in range(level.variants):
+            rng = random.Random()
+            rng.randrange = lambda stop: variant
+            targets = [position for body_type, position, _ in level.layout(rng) if body_type == "target"]
+            assert len(targets) == spec["counts"]["target"]
+            for index, (x, y) in enumerate(targets):
+                assert ((x - const.CANNON_POSITION[0]) ** 2 + (y - const.CANNON_POSITION[1]) ** 2) ** 0.5 \
+                    >= rules["min_cannon_distance"]
+                assert all(((x - px) ** 2 + (y - py) ** 2) ** 0.5 >= rules["min_separation"]
+                           for px, py in targets[:index])
+
+
+def test_cache_round_trip():
+    compiled = levels.compile_levels(LEVEL_FILE)
+    digest = bytes(range(32))
+    loaded = levels.from_bytes(levels.to_bytes(compiled, digest), digest)
+    assert len(loaded) == len(compiled)
+    for before, after in zip(compiled, loaded):
+        assert (after.number, after.background, after.text_color, after.variants) == \
+            (before.number, before.background, before.text_color, before.variants)
+        assert after.bodies == before.bodies
+        assert list(after.positions) == list(before.positions)
+        assert (after.target_speed, after.target_min_speed, after.obstacle_speed) == \
+            (before.target_speed, before.target_min_speed, before.obstacle_speed)
+
+
+def test_cache_of_another_file_is_not_used():
+    data = levels.to_bytes(levels.compile_levels(LEVEL_FILE), bytes(32))
+    assert levels.from_bytes(data, bytes([1]) * 32) is None
+    with pytest.raises(ValueError, match="level cache"):
+        levels.from_bytes(b"XXXX" + data[4:])
+
+
+def test_load_levels_writes_and_reuses_the_cache(tmp_path):
+    cache = tmp_path / "levels.bin"
+    first = levels.load_levels(const.LEVELS_FILE, str(cache))
+    assert cache.exists()
+    stored = cache.read_bytes()
+    second = levels.load_levels(const.LEVELS_FILE, str(cache))
+    assert cache.read_bytes() == stored
+    assert [list(level.positions) for level in second] == [list(level.positions) for level in first]
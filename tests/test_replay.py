@@ -0,0 +1,113 @@
+import math
+import random
+
+import pytest
+
+import cannon_constants as const
+from replay import (Replay, ReplayPlayer, PROJECTILE_TYPES, LEVEL, ROTATE, POWER, SELECT, SHOOT, RESET, END,
+                    VERSION)
+from simulation import World, FixedTimestep, ProjectileBody, cannon_tip, level_rng
+
+# Replays are the regression harness of the simulation: a recorded game has to re-simulate to the recorded scores.
+
+
+def play(seed):
+    # a whole game played headless the way CanGame plays it, with jittery frame times and seeded inputs, recorded
+    # as CanGame records it. Returns the replay.
+    inputs = random.Random(seed)
+    replay = Replay(seed)
+    timestep = FixedTimestep()
+    score, velocity, selected = 0, 50, "bullet"
+    for level in (1, 2, 3):
+        world = World()
+        world.populate(level, level_rng(seed, level))
+        snapshot = world.snapshot()
+        base_score, shots, angle = score, 10, 45
+        timestep.reset()
+        replay.record(0, LEVEL, level)
+        replay.record(0, SELECT, PROJECTILE_TYPES.index(selected))
+        replay.record(0, POWER, velocity)
+        for _ in range(2000):
+            score += timestep.advance(world, inputs.uniform(0.001, 0.05))
+            if not world.targets_left():
+                break
+            roll = inputs.random()
+            if roll < 0.05:
+                angle = max(0, min(90, angle + inputs.choice((-5, 5))))
+                replay.record(world.steps, ROTATE, angle)
+            elif roll < 0.07:
+                velocity = max(10, min(100, velocity + inputs.choice((-10, 10))))
+                replay.record(world.steps, POWER, velocity)
+            elif roll < 0.08:
+                selected = inputs.choice(PROJECTILE_TYPES)
+                replay.record(world.steps, SELECT, PROJECTILE_TYPES.index(selected))
+            elif roll < 0.10 and shots:
+                # aim roughly at a target, as a player would
+                target = inputs.choice([o for o in world.obstacles if o.obstacle_type == "target"])
+                dx, dy = target.position[0] - const.CANNON_POSITION[0], target.position[1] - const.CANNON_POSITION[1]
+                angle = 5 * round(math.degrees(math.atan2(dy, dx)) / 5) + inputs.choice((-5, 0, 5))
+                replay.record(world.steps, ROTATE, angle)
+                world.add_projectile(ProjectileBody(selected, cannon_tip(const.CANNON_POSITION, angle))).launch(
+                    angle, velocity)
+                shots -= 1
+                replay.record(world.steps, SHOOT)
+            elif roll < 0.1003:
+                world.restore(snapshot)
+                shots, score = 10, base_score - 15
+                base_score = score
+                replay.record(world.steps, RESET)
+        replay.record(world.steps, END, score)
+    return replay
+
+
+def test_bytes_round_trip():
+    replay = Replay(123456789, 1000, 700, levels=bytes(range(32)))
+    for step, code, arg in [(0, LEVEL, 1), (0, POWER, 50), (3, ROTATE, -5), (400, ROTATE, 355), (100000, SHOOT, 0),
+                            (0, LEVEL, 2), (7, END, -45)]:
+        replay.record(step, code, arg)
+    back = Replay.from_bytes(replay.to_bytes())
+    assert (back.seed, back.width, back.height, back.levels, back.events) == \
+           (replay.seed, replay.width, replay.height, replay.levels, replay.events)
+
+
+def test_other_versions_are_rejected():
+    data = bytearray(Replay(1).to_bytes())
+    data[4] = VERSION - 1
+    with pytest.raises(ValueError):
+        Replay.from_bytes(bytes(data))
+
+
+def test_truncated_or_corrupt_files_raise_value_errors():
+    replay = Replay(7, levels=bytes(32))
+    for step, code, arg in [(0, LEVEL, 1), (300, ROTATE, 1000), (20000, SHOOT, 0), (20005, END, -300)]:
+        replay.record(step, code, arg)
+    data = replay.to_bytes()
+    for end in range(len(data)):
+        try:
+            Replay.from_bytes(data[:end])
+        except ValueError:
+            pass
+    with pytest.raises(ValueError):
+        Replay.from_bytes(data + bytes([0, 99, 0]))
+    with pytest.raises(ValueError):
+        Replay.from_bytes(data + bytes([0x80] * 12))
+
+
+@pytest.mark.parametrize("seed", [-1, 2 ** 32])
+def test_seeds_the_format_cannot_hold_are_refused(seed):
+    with pytest.raises(ValueError):
+        Replay(seed, levels=bytes(32))
+
+
+def test_other_level_files_are_refused():
+    with pytest.raises(ValueError):
+        ReplayPlayer(Replay(1, levels=bytes(32)))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_replay_reproduces_the_game(seed):
+    replay = Replay.from_bytes(play(seed).to_bytes())
+    results = ReplayPlayer(replay).run()
+    assert [result["level"] for result in results] == [1, 2, 3]
+    assert all(result["matches"] for result in results), results
+    assert ReplayPlayer(replay).run() == results
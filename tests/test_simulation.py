@@ -0,0 +1,98 @@
+import copy
+
+import pytest
+
+import cannon_constants as const
+from simulation import World, ObstacleBody, ProjectileBody
+
+# Swept hit detection: hits are found along the whole path of a step, earliest first, and a projectile sent
+# elsewhere by a hit does not go on hitting along its old path.
+
+STEP_DT = 1 / 120
+
+
+def still(obstacle_type, position, health=None):
+    body = ObstacleBody(obstacle_type, position, movable=False, hit_radius=40 if obstacle_type == "target" else None)
+    if health is not None:
+        body.health = health
+    return body
+
+
+def shot(world, position, velocity, projectile_type="bullet"):
+    projectile = world.add_projectile(ProjectileBody(projectile_type, position))
+    projectile.velocity = list(velocity)
+    return projectile
+
+
+def test_time_of_impact_is_the_fraction_of_the_step_at_contact():
+    obstacle = still("rock", (100, 0))
+    projectile = ProjectileBody("bullet", (0, 0))
+    projectile.position = [200, 0]
+    reach = obstacle.hit_radius + projectile.get_radius()
+    assert obstacle.time_of_impact(projectile) == pytest.approx((100 - reach) / 200)
+
+
+def test_no_hit_when_passing_by_or_moving_away():
+    obstacle = still("rock", (100, 0))
+    passing = ProjectileBody("bullet", (0, 100))
+    passing.position = [200, 100]
+    leaving = ProjectileBody("bullet", (100, 45))
+    leaving.prev_position = [100, 45]
+    leaving.position = [100, 90]
+    assert obstacle.time_of_impact(passing) is None
+    assert obstacle.time_of_impact(leaving) is None
+
+
+def test_fast_projectile_hits_a_target_it_jumps_over():
+    # 500 pixels in one step: both ends of the step are clear of the target, the path is not
+    world = World()
+    target = world.add_obstacle(still("target", (500, 300), health=1))
+    projectile = shot(world, (300, 300), (500 / STEP_DT, 0))
+    assert world.step(STEP_DT) == 10
+    assert not target.active and not projectile.active
+
+
+def test_hits_are_resolved_earliest_first():
+    world = World()
+    far = world.add_obstacle(still("rock", (400, 300), health=1))
+    near = world.add_obstacle(still("rock", (250, 300), health=1))
+    shot(world, (100, 300), (400 / STEP_DT, 0))
+    world.step(STEP_DT)
+    assert not near.active
+    assert far.active and far in world.obstacles
+
+
+def test_teleported_projectile_does_not_hit_along_its_old_path():
+    world = World()
+    world.add_obstacle(still("wormhole", (300, 300)))
+    world.add_obstacle(still("wormhole", (800, 600)))
+    target = world.add_obstacle(still("target", (420, 300), health=1))
+    projectile = shot(world, (220, 300), (300 / STEP_DT, 0))
+    assert world.step(STEP_DT) == 0
+    assert target.active
+    assert projectile.position == [840, 640]
+
+
+def test_reflected_laser_does_not_hit_along_its_old_path():
+    world = World()
+    world.add_obstacle(still("mirror", (300, 300)))
+    target = world.add_obstacle(still("target", (450, 300), health=1))
+    laser = shot(world, (150, 300), (400 / STEP_DT, 0), "laser")
+    world.step(STEP_DT)
+    assert target.active
+    assert laser.velocity[0] < 0
+
+
+def test_grid_finds_the_same_hits_as_testing_every_pair(monkeypatch):
+    from benchmarks.bench_simulation import crowded_world
+
+    for seed in range(5):
+        world = crowded_world(60, 20, seed)
+        outcomes = []
+        for threshold in (0, 10 ** 9):
+            monkeypatch.setattr(const, "BROAD_PHASE_MIN_PROJECTILES", threshold)
+            run = copy.deepcopy(world)
+            scores = [run.step(STEP_DT) for _ in range(120)]
+            outcomes.append((scores, [body.position for body in run.obstacles],
+                             [body.position for body in run.projectiles]))
+        assert outcomes[0] == outcomes[1]
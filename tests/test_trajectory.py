@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import cannon_constants as const
+from simulation import World, cannon_tip
+from trajectory import predicted_points, preview_points
+
+# The simulated preview follows the whole flight: in an empty world it is as long as the closed-form path.
+
+
+def length(points):
+    return np.hypot(*np.diff(points, axis=0).T).sum()
+
+
+@pytest.mark.parametrize("projectile_type, angle, power", [
+    ("bullet", 45, 50), ("bullet", 20, 30), ("bombshell", 45, 50), ("bombshell", 45, 20), ("laser", 30, 50),
+    ("laser", 60, 50),
+])
+def test_empty_world_preview_matches_the_closed_form_path(projectile_type, angle, power):
+    start = cannon_tip(const.CANNON_POSITION, angle)
+    simulated = predicted_points(World(), projectile_type, start, angle, power)
+    assert len(simulated) == 1
+    assert length(simulated[0]) == pytest.approx(length(preview_points(projectile_type, start, angle, power)),
+                                                 rel=0.02)
+
+
+def test_laser_preview_stops_at_the_top_of_the_field():
+    start = cannon_tip(const.CANNON_POSITION, 80)
+    points = predicted_points(World(), "laser", start, 80, 50)[0]
+    assert points[:, 1].max() <= const.SCREEN_HEIGHT + const.LASER_VEL / const.PHYSICS_RATE
+
+
+def test_simulated_previews_are_reused_while_the_obstacles_stay_put():
+    from simulation import level_rng
+    from trajectory import TrajectoryCache
+
+    cache = TrajectoryCache(background=False)
+    start = cannon_tip(const.CANNON_POSITION, 45)
+    first, second = World(), World()
+    first.populate(2, level_rng(7, 2))
+    second.populate(2, level_rng(7, 2))
+    mesh = cache.get("bullet", start, 45, 50, world=first)
+    assert cache.get("bullet", start, 45, 50, world=second) is mesh
+    for body in second.obstacles:
+        body.position[0] += 50
+    assert cache.get("bullet", start, 45, 50, world=second) is not mesh
+    assert (cache.hits, cache.misses) == (1, 2)
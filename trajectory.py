@@ -0,0 +1,237 @@
+import math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import cannon_constants as const
+from diagnostics import get_logger
+from simulation import ProjectileBody, launch_velocity
+
+log = get_logger("trajectory")
+
+# Trajectory Module: path of the dashed preview line. In a level the shot is predicted by stepping a copy of the
+# headless world with the same fixed step as live play, so mirrors, wormholes and perpetios shape the preview exactly
+# as they shape the real shot, for as long as the flight lasts. Without a world the closed-form flight is used,
+# clipped analytically to the part the player can use and evaluated with NumPy in one shot. Either way the number
+# of points is bounded by a pixel budget.
+
+
+def flight_time(projectile_type, start, velocity, width=const.SCREEN_WIDTH, height=const.SCREEN_HEIGHT):
+    # time at which the preview stops: the earliest of leaving the sides of the field, hitting the ground or
+    # (for lasers) running out of time or distance
+    x0, y0 = start
+    vx, vy = velocity
+    limits = []
+    if vx > 0:
+        limits.append((width - x0) / vx)
+    elif vx < 0:
+        limits.append(-x0 / vx)
+
+    if projectile_type == "laser":
+        limits.append(min(const.LASER_IMPULSE, const.LASER_DIST / const.LASER_VEL))
+        if vy > 0:
+            limits.append((height - y0) / vy)
+        elif vy < 0:
+            limits.append(-y0 / vy)
+    else:
+        # solve y0 + vy * t - g / 2 * t^2 = 0 for the positive root
+        g = const.GRAVITY
+        limits.append((vy + math.sqrt(max(vy * vy + 2 * g * y0, 0))) / g)
+    return max(0.0, min(limits))
+
+
+def preview_points(projectile_type, start, angle, power, width=const.SCREEN_WIDTH, height=const.SCREEN_HEIGHT,
+                   spacing=const.TRAJ_POINT_SPACING, max_points=const.TRAJ_MAX_POINTS):
+    # (n, 2) array of points along the predicted path, roughly `spacing` pixels apart and at most max_points long
+    velocity = launch_velocity(projectile_type, angle, power)
+    t_max = flight_time(projectile_type, start, velocity, width, height)
+    gravity = 0.0 if projectile_type == "laser" else const.GRAVITY
+
+    def positions(t):
+        return np.column_stack((start[0] + velocity[0] * t,
+                                start[1] + velocity[1] * t - 0.5 * gravity * t * t))
+
+    # measure the path on a fine grid, then cut it where the bombshell's drill distance runs out
+    fine = positions(np.linspace(0.0, t_max, max_points * 4 + 1))
+    if projectile_type == "bombshell":
+        return resample(fine, spacing, max_points, max_length=const.BOMB_DRILL)
+    return resample(fine, spacing, max_points)
+
+
+def resample(points, spacing=const.TRAJ_POINT_SPACING, max_points=const.TRAJ_MAX_POINTS, max_length=None):
+    # resample a dense polyline evenly in arc length, so the dashes keep the same on-screen size along the whole
+    # path, with roughly `spacing` pixels between points and at most max_points of them
+    travelled = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))))
+    length = travelled[-1] if max_length is None else min(travelled[-1], max_length)
+    count = int(min(max_points, max(2, length // spacing + 1)))
+    at = np.linspace(0.0, length, count)
+    return np.column_stack((np.interp(at, travelled, points[:, 0]), np.interp(at, travelled, points[:, 1])))
+
+
+def _flight_steps(projectile, width, height, step_dt):
+    # steps until the projectile's free flight from where it is now ends, one more to make sure it gets there
+    return math.ceil(flight_time(projectile.projectile_type, projectile.position, projectile.velocity, width, height)
+                     / step_dt) + 1
+
+
+def simulate_path(world, projectile_type, start, angle, power, step_limit=const.TRAJ_STEP_BUDGET,
+                  step_dt=1.0 / const.PHYSICS_RATE, copy_world=True):
+    # fire a projectile into a copy of the world (into the world itself without copy_world, for callers that
+    # already hold a copy of their own) and record where it goes, step by step, until it is destroyed or
+    # leaves the visible field (a laser also at the top), or its free flight is over: the steps left are taken from
+    # flight_time() at launch and again whenever a wormhole or a mirror sends it elsewhere, never more than
+    # step_limit in all. Returns one dense (n, 2) array per straight run of the flight: a wormhole teleport starts
+    # a new piece so no line is drawn across the jump.
+    preview = world.copy() if copy_world else world
+    projectile = preview.add_projectile(ProjectileBody(projectile_type, start))
+    projectile.velocity = launch_velocity(projectile_type, angle, power)
+    laser = projectile_type == "laser"
+    steps_left = _flight_steps(projectile, preview.width, preview.height, step_dt)
+    pieces = [[tuple(start)]]
+    for _ in range(step_limit):
+        vx, vy = projectile.velocity
+        preview.step(step_dt)
+        x, y = projectile.position
+        teleported = projectile.prev_position == projectile.position
+        if teleported:
+            pieces.append([])           # no line across the jump
+        pieces[-1].append((x, y))
+        if not projectile.active or x < 0 or x > preview.width or y < 0 or (laser and y > preview.height):
+            break
+        # gravity only changes vy: a jump or any other change of velocity is a wormhole or a mirror
+        if teleported or projectile.velocity[0] != vx or (laser and projectile.velocity[1] != vy):
+            steps_left = _flight_steps(projectile, preview.width, preview.height, step_dt)
+        else:
+            steps_left -= 1
+            if steps_left <= 0:
+                break
+    return [np.array(piece) for piece in pieces if len(piece) > 1]
+
+
+def predicted_points(world, projectile_type, start, angle, power, spacing=const.TRAJ_POINT_SPACING,
+                     max_points=const.TRAJ_MAX_POINTS, copy_world=True):
+    # simulated preview resampled to the pixel budget, shared between the pieces in proportion to their length
+    pieces = simulate_path(world, projectile_type, start, angle, power, copy_world=copy_world)
+    lengths = [np.hypot(*np.diff(piece, axis=0).T).sum() for piece in pieces]
+    total = sum(lengths) or 1
+    return [resample(piece, spacing, max(2, int(max_points * length / total)))
+            for piece, length in zip(pieces, lengths)]
+
+
+def simulated_mesh(world, projectile_type, start, angle, power, copy_world=True):
+    # dash buffers of the simulated preview, every piece in one mesh
+    pieces = predicted_points(world, projectile_type, start, angle, power, copy_world=copy_world)
+    return merge_meshes(dash_mesh(piece) for piece in pieces)
+
+
+def dash_mesh(points, dash_length=5, gap_length=3, width=const.TRAJ_LINE_WIDTH):
+    # turn the path into the vertex and index buffers of a single Kivy Mesh (mode "triangles"): dashes of
+    # dash_length points separated by gap_length points, each segment of a dash drawn as a quad `width` pixels thick
+    start = points[:-1]
+    end = points[1:]
+    in_dash = (np.arange(len(start)) % (dash_length + gap_length)) < dash_length - 1
+    start, end = start[in_dash], end[in_dash]
+
+    direction = end - start
+    length = np.hypot(direction[:, 0], direction[:, 1])
+    length[length == 0] = 1
+    normal = np.column_stack((-direction[:, 1], direction[:, 0])) / length[:, None] * (width / 2)
+
+    # four corners per segment, each vertex laid out as (x, y, u, v)
+    corners = np.stack((start + normal, start - normal, end - normal, end + normal), axis=1)
+    vertices = np.zeros((len(start), 4, 4))
+    vertices[:, :, :2] = corners
+    base = np.arange(len(start))[:, None] * 4
+    indices = base + np.array([0, 1, 2, 2, 3, 0])
+    return vertices.ravel().tolist(), indices.ravel().tolist()
+
+
+def merge_meshes(meshes):
+    # concatenate several (vertices, indices) buffers into one, offsetting the indices of each part
+    all_vertices, all_indices = [], []
+    for vertices, indices in meshes:
+        offset = len(all_vertices) // 4
+        all_vertices.extend(vertices)
+        all_indices.extend(index + offset for index in indices)
+    return all_vertices, all_indices
+
+
+# TrajectoryCache Class: LRU cache of ready-made dash mesh buffers keyed on the shot parameters. The cannon angle
+# moves in 5 degree steps and the velocity in steps of 10, so a handful of entries covers nearly every refresh.
+# Simulated previews also depend on the obstacles: they are keyed on the world's layout version and on its
+# state_key(), the obstacles rounded to const.TRAJ_STATE_QUANTUM pixels, so a preview is reused until the obstacles
+# have moved noticeably, and by any world holding the same layout. Stepping the world
+# takes several milliseconds, so with `background` set they are computed on a worker thread from a copy of the world
+# taken at the request, and the caller keeps its current mesh until the new one is ready.
+
+class TrajectoryCache:
+    def __init__(self, maxsize=const.TRAJ_CACHE_SIZE, background=True):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.pending = {}       # key -> Future of a simulated preview being computed
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trajectory") if background else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, projectile_type, start, angle, power, width=const.SCREEN_WIDTH, height=const.SCREEN_HEIGHT,
+            world=None, on_ready=None):
+        # the mesh buffers of a preview, or None while a simulated one is computed on the worker; on_ready is then
+        # called (on the worker thread) once a new get() will find it
+        key = (projectile_type, angle, power, round(start[0], 2), round(start[1], 2), width, height)
+        if world is not None:
+            key += (world.layout_version, world.state_key())
+        self._collect()
+        mesh = self.entries.get(key)
+        if mesh is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return mesh
+        if key in self.pending:
+            return None
+
+        self.misses += 1
+        if world is None:
+            mesh = dash_mesh(preview_points(projectile_type, start, angle, power, width, height))
+        elif self.executor is None:
+            mesh = simulated_mesh(world, projectile_type, start, angle, power)
+        else:
+            # only the latest shot matters: drop the jobs that have not started yet
+            for future in self.pending.values():
+                future.cancel()
+            # the worker steps this copy itself: the world keeps changing on the UI thread meanwhile
+            future = self.executor.submit(simulated_mesh, world.copy(), projectile_type, start, angle, power,
+                                          copy_world=False)
+            if on_ready is not None:
+                future.add_done_callback(lambda done: on_ready())
+            self.pending[key] = future
+            return None
+        self._store(key, mesh)
+        return mesh
+
+    def _store(self, key, mesh):
+        self.entries[key] = mesh
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)   # evict the least recently used shot
+
+    def _collect(self):
+        # move the finished worker jobs into the cache
+        for key, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[key]
+            if future.cancelled():
+                continue
+            try:
+                self._store(key, future.result())
+            except Exception:
+                log.exception("Trajectory preview failed")
+
+    def clear(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        self.entries.clear()
+
+    def stats(self):
+        return {"size": len(self.entries), "pending": len(self.pending), "hits": self.hits, "misses": self.misses}